@@ -50,7 +50,7 @@ if __name__ == "__main__":
                                              multi_parent=True)    #If multiple synsets are above the value, we keep all of them (DAG instead of tree)
     methods=[(HierarchyGeneration.synsetResolve,'independent'),     #Performs resolution on the properties of the synset (synonyms and such). Single pass and don't care about the other elements
              (HierarchyGeneration.definitionResolve,'independent'), #Performs resoultion on the definition of the candidates. Single pass as well
-             (HierarchyGeneration.pathResolve,'dependent-repeat')]  #Wu-palmer similarity to build up the synsets. Continues on all synsets until there is no change in the list
+             (HierarchyGeneration.pathResolve,'dependent-delta')]   #Wu-palmer similarity to build up the synsets. Continues until there is no change in the list, each round only comparing against the synsets found in the round before
     
     res.resolveSynsets(generators,methods)
     answers = res.getAnswers()
@@ -0,0 +1,177 @@
+###############################################################################
+##BinaryFormat.py
+##Last Modified: 10-18-2026
+##
+##A simple file format for groups of numpy arrays that can be opened with
+##numpy.memmap. The file starts with a magic string, the length of a JSON
+##header, and the header itself, which gives the dtype, shape and offset of
+##every array. Each array starts on a 64 byte boundary, so opening a file only
+##reads the header, and several processes can share the same read-only pages
+###############################################################################
+import os
+import json
+import struct
+import numpy as np
+
+##The bytes every file starts with
+MAGIC="ASEGBIN\x00"
+
+##The version of the layout, stored after the magic string
+FORMAT_VERSION=1
+
+##Arrays start on a multiple of this many bytes
+ALIGNMENT=64
+
+##The magic string, the version, and the length of the header
+PREAMBLE=struct.Struct("<8sIQ")
+
+##Gives the number of bytes needed to pad a position to the alignment
+def padding(position):
+    return (ALIGNMENT-position%ALIGNMENT)%ALIGNMENT
+
+##Writes a group of arrays to a file. The file is written next to the path and moved into place,
+#so a reader never sees half a file
+#@param path The file to write
+#@param kind A string naming what the file holds, which is checked when it is opened
+#@param arrays A dictionary of name=>array
+#@param meta (Defaults to None) A dictionary of extra values (anything json can store) kept in the header
+def writeArrays(path,kind,arrays,meta = None):
+    names=sorted(arrays)
+    arrays=dict((name,np.ascontiguousarray(arrays[name])) for name in names)
+    entries={}
+    offset=0
+    for name in names:
+        offset+=padding(offset)
+        entries[name]={"dtype":arrays[name].dtype.str,"shape":list(arrays[name].shape),"offset":offset}
+        offset+=arrays[name].nbytes
+    header=json.dumps({"kind":kind,"meta":meta or {},"arrays":entries},sort_keys=True)
+    start=PREAMBLE.size+len(header)
+    start+=padding(start)
+    #The offsets in the header are from the start of the data, so the header does not depend on its own length
+    temporary=path+".tmp"
+    with open(temporary,"wb") as f:
+        f.write(PREAMBLE.pack(MAGIC,FORMAT_VERSION,len(header)))
+        f.write(header)
+        f.write("\x00"*(start-PREAMBLE.size-len(header)))
+        position=0
+        for name in names:
+            f.write("\x00"*(entries[name]["offset"]-position))
+            f.write(arrays[name].tobytes())
+            position=entries[name]["offset"]+arrays[name].nbytes
+    os.rename(temporary,path)
+
+##A file written by writeArrays. Only the header is read when it is opened, and each array is mapped the first time it is used
+class BinaryFile:
+    ##Opens a file and reads its header
+    #@param path The file to open
+    #@param kind (Defaults to None) The kind the file must hold. None accepts any kind
+    #@param mmap (Defaults to True) If true the arrays are memory mapped (read only), otherwise they are read into memory
+    def __init__(self,path,kind = None,mmap = True):
+        ##The file being read
+        self.path=path
+
+        ##If the arrays are memory mapped
+        self.mmap=mmap
+
+        with open(path,"rb") as f:
+            preamble=f.read(PREAMBLE.size)
+            if len(preamble) != PREAMBLE.size:
+                raise ValueError(path+" is not a binary array file")
+            (magic,version,length)=PREAMBLE.unpack(preamble)
+            if magic != MAGIC:
+                raise ValueError(path+" is not a binary array file")
+            if version != FORMAT_VERSION:
+                raise ValueError(path+" has format version "+str(version)+", expected "+str(FORMAT_VERSION))
+            header=json.loads(f.read(length))
+        if kind is not None and header["kind"] != kind:
+            raise ValueError(path+" holds "+header["kind"]+", expected "+kind)
+
+        ##What the file holds
+        self.kind=header["kind"]
+
+        ##The extra values stored in the header
+        self.meta=header["meta"]
+
+        ##name=>the dtype, shape and offset of each array
+        self.__entries=header["arrays"]
+
+        ##Where the data starts in the file
+        self.__start=PREAMBLE.size+length+padding(PREAMBLE.size+length)
+
+        ##name=>array, filled in as the arrays are used
+        self.__arrays={}
+
+    ##Gets an array, mapping (or reading) it the first time
+    #@param name The name of the array
+    #@returns the array, which is read only when it is memory mapped
+    def array(self,name):
+        if name not in self.__arrays:
+            if name not in self.__entries:
+                raise KeyError(name)
+            entry=self.__entries[name]
+            dtype=np.dtype(str(entry["dtype"]))
+            shape=tuple(entry["shape"])
+            count=int(np.prod(shape))
+            if count == 0:
+                #An empty array cannot be mapped
+                self.__arrays[name]=np.zeros(shape,dtype=dtype)
+            elif self.mmap:
+                self.__arrays[name]=np.memmap(self.path,dtype=dtype,mode="r",offset=self.__start+entry["offset"],shape=shape)
+            else:
+                with open(self.path,"rb") as f:
+                    f.seek(self.__start+entry["offset"])
+                    self.__arrays[name]=np.fromfile(f,dtype=dtype,count=count).reshape(shape)
+        return self.__arrays[name]
+
+    ##The names of the arrays in the file
+    def names(self):
+        return sorted(self.__entries)
+
+    def __contains__(self,name):
+        return name in self.__entries
+
+    def __getitem__(self,name):
+        return self.array(name)
+
+##Interns strings into consecutive ids and stores them as one block of utf-8 bytes with an offset for each string
+class StringTable:
+    ##Creates an empty table
+    def __init__(self):
+        ##string=>id
+        self.ids={}
+
+        ##The strings in id order
+        self.strings=[]
+
+    ##Gets the id of a string, adding it if needed
+    #@param string A str or unicode string
+    #@returns the integer id of the string
+    def intern(self,string):
+        if string not in self.ids:
+            self.ids[string]=len(self.strings)
+            self.strings.append(string)
+        return self.ids[string]
+
+    ##Turns the table into arrays
+    #@returns a tuple of (offsets,data) where string i is data[offsets[i]:offsets[i+1]]
+    def arrays(self):
+        encoded=[s.encode("utf-8") if isinstance(s,unicode) else s for s in self.strings]
+        offsets=np.zeros(len(encoded)+1,dtype=np.int64)
+        offsets[1:]=np.cumsum([len(s) for s in encoded])
+        return (offsets,np.array(bytearray("".join(encoded)),dtype=np.uint8))
+
+    def __len__(self):
+        return len(self.strings)
+
+##Reads a string out of the arrays made by StringTable.arrays
+#@param offsets The offsets array
+#@param data The bytes array
+#@param index The id of the string
+#@returns the string (a str when it is plain ascii, unicode otherwise)
+def readString(offsets,data,index):
+    raw=data[int(offsets[index]):int(offsets[index+1])].tobytes()
+    try:
+        raw.decode("ascii")
+        return raw
+    except UnicodeDecodeError:
+        return raw.decode("utf-8")
@@ -1,4 +1,7 @@
 import copy
+import numbers
+import numpy as np
+from Traversal import leaves,findSynset,numberBreadthFirst,numberDepthFirst,postOrder,childList
 
 ##The wordnet node class is the main data structure for creating and connecting
 #ontology objects found in wordnet together
@@ -35,6 +38,9 @@ class WordNetNode:
         #specific to a given synset
         self.__properties=[]
 
+        ##The WordNetForest indexing this node (if any), which is told when links change
+        self.__forest=None
+
     ##Returns the name of the wordnet node, which is found from self.synset
     def __str__(self):
         '''Returns a print of the verb's name'''
@@ -56,12 +62,14 @@ class WordNetNode:
                 self.__children.append(node)
             if recip:
                 node.attachToParent(self,multi=multi)
+            linkForest(self,node)
     ##Removes a child WNN from the list if it exists
     ##@param node The node that is to be removed
     def removeChild(self,node):
         if node is not None and self.__children is not None:
             if node in self.__children:
                 self.__children.remove(node)
+                unlinkForest(self,node)
 
 
     ##Removes a parent node from the list if it exists
@@ -71,12 +79,14 @@ class WordNetNode:
             if isinstance(self.__parent,list):
                 if node in self.__parent:
                     self.__parent = [i for i in self.__parent if i != node]
+                    unlinkForest(node,self)
             else:
                 if node == self.__parent:
                     self.__parent = None
+                    unlinkForest(node,self)
 
     ##Attaches itself to a parent
-    #@param node The parent wordnet node
+    #@param node The parent wordnet node, or a list of parent nodes which replaces the current parent
     def attachToParent(self,node,multi=False):
         if not multi or node is None or self.__parent is None:
             #If we aren't doing a multiple parent hierarchy or we are providing None to it
@@ -125,6 +135,31 @@ class WordNetNode:
     def setNumber(self,number):
         self.__number=number
 
+    ##The getter for the post number given by depth first search
+    #@returns The post number of the node, or None if a post number has not been assigned
+    def getPostNumber(self):
+        return self.__post_number
+
+    ##Gives the Wordnet Node a post number
+    #@param number The post number to set the node to
+    def setPostNumber(self,number):
+        self.__post_number=number
+
+    ##What traversals use to tell nodes apart
+    #@returns a value that is the same for (and only for) the same node
+    def identity(self):
+        return id(self)
+
+    ##The getter for the forest indexing this node
+    #@returns a WordNetForest, or None
+    def getForest(self):
+        return self.__forest
+
+    ##Sets the forest indexing this node (the forest does this itself)
+    #@param forest The WordNetForest, or None
+    def setForest(self,forest):
+        self.__forest=forest
+
     ##For synset determination, we attach a score to the node, which may be one of many scores if
     #@param pos The position to replace. Defaults to -1 which means we return the whole list
     #@returns the score or a list of scores
@@ -162,77 +197,48 @@ class WordNetNode:
     def setProperties(self,properties):
         self.__properties=properties
 
-    ##Performs a recursive search to find all sinks in the graph node
-    #@returns All found sinks (nodes with no children)
+    ##Finds all sinks under the node
+    #@returns All found sinks (nodes with no children), each given once
     def getSinks(self):
-        '''Returns all objects that are leaves, recursively'''
-        if self.__children is None:
-            return [self]
-        leaves=[]
-        for child in self.__children:
-            leaves.extend(child.getSinks())
-        return leaves
+        '''Returns all objects that are leaves'''
+        return list(leaves(self))
 
-    ##Determines if the verb is already a synset in the tree.
+    ##Determines if the verb is already a synset in the tree. A node in a WordNetForest asks the forest's index,
+    #so only the links above the nodes holding the synset are followed instead of the whole subtree
     #@returns back the node if it is a child of this node or None otherwise
     def inTree(self,verb):
-        if self.__synset is verb:
-            return self
-        if self.__children is not None:
-            for child in self.__children:
-                found=child.inTree(verb)
-                if found is not None:
-                    return found
-        return None
+        forest=self.getForest()
+        if forest is None:
+            return findSynset(self,verb)
+        return forest.findUnder(self,verb)
 
     ##Determines which properties can be combined from the children onto this node
     def combineProperties(self):
-        if self.__children is not None:
-            #if str(self) == "Steal":
-            #    print list(reduce(lambda x,y:x.intersection(y),[set(i.getProperties()) for i in self.__children]))
-            props = list(reduce(lambda x,y:x.intersection(y),[set(i.getProperties()) for i in self.__children]))
-            #if len(props) > 0:
-            #    print str(self),[str(i) for i in self.__children],props
-            if isinstance(self.__properties,list) and len(self.__properties) > 0:
-                #print str(self),props,self.__properties
-                props = list(set(props).intersection(set(self.__properties)))
-                #print str(self),props,self.__properties
+        children=self.getChildren()
+        if children is not None:
+            props = list(reduce(lambda x,y:x.intersection(y),[set(i.getProperties()) for i in children]))
+            properties=self.getProperties()
+            if isinstance(properties,list) and len(properties) > 0:
+                props = list(set(props).intersection(set(properties)))
                 if len(props) > 0:
-                    #print str(self),list(set(self.__properties).union(set(props)))
-                    self.__properties = list(set(self.__properties).union(props)) #At the end, we absorb them if we can
+                    self.setProperties(list(set(properties).union(props))) #At the end, we absorb them if we can
             else:
-                #print str(self),props
-                self.__properties = props
+                self.setProperties(props)
 
     ##Removes properties that are in both the parent and children from the children (so we move the properties up the hierarchy)
     def removePropertiesFromChildren(self):
-        if self.__children is not None and isinstance(self.__properties,list):
-            for child in self.__children:
+        children=self.getChildren()
+        properties=self.getProperties()
+        if children is not None and isinstance(properties,list):
+            for child in children:
                 if isinstance(child.getProperties(),list) and len(child.getProperties()) > 0:
-                    #print list(filter(lambda x: x not in self.__properties,child.getProperties()))
-                    child.setProperties(list(filter(lambda x: x not in self.__properties,child.getProperties())))
-                    #if len(child.getProperties()) == 0:
-                    #    print str(child),"was removed, is now",str(self)
-        
-            
+                    child.setProperties(list(filter(lambda x: x not in properties,child.getProperties())))
 
-    ##Performs a recursive Depth First Search on the given tree.
+    ##Performs a Depth First Search on the given tree.
     #@param start_number The starting number to count in the search
     #@returns The number calculated after running depth first search, including post number counts
     def depthFirstSearch(self,start_number):
-        num=start_number
-        ##If we don't have a number, then we haven' visited yet
-        if self.__number is None:
-            self.__number=num
-            num+=1
-            ##If there are children, then we want to visit them as well
-            if self.__children is not None:
-                for child in self.__children:
-                    num=child.depthFirstSearch(num)
-            if self.__post_number is None:
-                self.__post_number=num
-                num+=1
-        return num
+        return numberDepthFirst(self,start_number)
 
     ##This replaces a node with another node, which changes the nodes parent and adds all of it's children
     #@param node The wordnet node to have copied into this node
@@ -250,35 +256,812 @@ class WordNetNode:
         return None
         
 
+##The marker for a number that has not been assigned in a NodeArena
+UNNUMBERED=np.iinfo(np.int64).min
+
+##A compact store for a whole forest of nodes. Instead of one WordNetNode object per node, every field is kept in
+#numpy arrays indexed by node: the synset (as an id into a table of distinct synsets), the sense, the numbers,
+#the scores and the links. Parent and child links are kept as linked lists in a shared pool of edges so they can
+#still be added and removed one at a time, and can be exported as CSR arrays. Anything attached to a node that is not
+#a node of this arena (plain WordNetNodes, the cluster numbers used by buildForestWordVectors) is kept in a side table.
+#Nodes are used through ArenaNode views, which act like WordNetNodes
+class NodeArena:
+    ##Creates an empty arena
+    #@param capacity The number of nodes (and edges) to make room for at first. The arrays double when full
+    #@param score_width The number of scores per node to make room for at first
+    def __init__(self,capacity = 1024,score_width = 4):
+        capacity=max(1,capacity)
+        score_width=max(1,score_width)
+
+        ##The number of nodes in the arena
+        self.__size=0
+
+        ##The distinct synsets (or strings) held by the nodes, and their ids
+        self.__synsets=[]
+        self.__synset_ids={}
+
+        ##Values that are linked to nodes but are not nodes of this arena. Each value is kept once (by identity) with the
+        #number of edges pointing at it, and its slot is freed when the last of them is removed
+        self.__foreign=[]
+        self.__foreign_slots={}
+        self.__foreign_refs=[]
+        self.__free_foreign=[]
+
+        ##Per node fields
+        self.__synset=np.zeros(capacity,dtype=np.int32)
+        self.__sense=np.zeros(capacity,dtype=np.int32)
+        self.__number=np.empty(capacity,dtype=np.int64)
+        self.__post_number=np.empty(capacity,dtype=np.int64)
+
+        ##0 if the node has no parent, 1 for a single parent, 2 for a list of parents (as attachToParent with multi)
+        self.__parent_state=np.zeros(capacity,dtype=np.int8)
+
+        ##0 if the node has never had a child (getChildren gives None), 1 if it has a list of children
+        self.__child_state=np.zeros(capacity,dtype=np.int8)
+
+        ##The first and last edge of the parent and child lists of every node (-1 for empty)
+        self.__parent_head=np.empty(capacity,dtype=np.int32)
+        self.__parent_tail=np.empty(capacity,dtype=np.int32)
+        self.__child_head=np.empty(capacity,dtype=np.int32)
+        self.__child_tail=np.empty(capacity,dtype=np.int32)
+
+        ##The scores of every node. Ints and floats are kept in the matrix (with a flag for ints so they come
+        #back as ints), any other score (i.e. word vectors) moves the whole list of the node to score_lists
+        self.__score=np.zeros((capacity,score_width),dtype=np.float64)
+        self.__score_is_int=np.zeros((capacity,score_width),dtype=bool)
+        self.__score_length=np.zeros(capacity,dtype=np.int32)
+        self.__score_lists={}
+
+        ##node=>properties, for the nodes that have been given any
+        self.__properties={}
+
+        ##node=>WordNetForest, for the nodes indexed by a forest
+        self.__forests={}
+
+        ##The edge pool. A target >= 0 is a node, a target < 0 is -(position in foreign)-1
+        self.__edge_target=np.zeros(capacity,dtype=np.int32)
+        self.__edge_next=np.zeros(capacity,dtype=np.int32)
+        self.__edge_count=0
+
+        ##The first removed edge that can be reused (-1 if there are none)
+        self.__free_edge=-1
+
+    def __len__(self):
+        return self.__size
+
+    ##Makes room for one more node
+    def __growNodes(self):
+        capacity=len(self.__synset)
+        if self.__size < capacity:
+            return None
+        new_capacity=capacity*2
+        for name in ("synset","sense","number","post_number","parent_state","child_state","parent_head","parent_tail","child_head","child_tail","score_length"):
+            attribute="_NodeArena__"+name
+            old=getattr(self,attribute)
+            new=np.zeros(new_capacity,dtype=old.dtype)
+            new[:capacity]=old
+            setattr(self,attribute,new)
+        for name in ("score","score_is_int"):
+            attribute="_NodeArena__"+name
+            old=getattr(self,attribute)
+            new=np.zeros((new_capacity,old.shape[1]),dtype=old.dtype)
+            new[:capacity]=old
+            setattr(self,attribute,new)
+
+    ##Makes room for more scores per node
+    #@param width The number of scores that must fit
+    def __growScores(self,width):
+        if width <= self.__score.shape[1]:
+            return None
+        new_width=max(width,self.__score.shape[1]*2)
+        score=np.zeros((self.__score.shape[0],new_width),dtype=np.float64)
+        score[:,:self.__score.shape[1]]=self.__score
+        is_int=np.zeros((self.__score.shape[0],new_width),dtype=bool)
+        is_int[:,:self.__score.shape[1]]=self.__score_is_int
+        self.__score=score
+        self.__score_is_int=is_int
+
+    ##Takes an edge from the pool
+    #@param target The encoded target of the edge
+    #@returns the position of the edge
+    def __newEdge(self,target):
+        if self.__free_edge >= 0:
+            edge=self.__free_edge
+            self.__free_edge=int(self.__edge_next[edge])
+        else:
+            if self.__edge_count == len(self.__edge_target):
+                self.__edge_target=np.concatenate((self.__edge_target,np.zeros(len(self.__edge_target),dtype=np.int32)))
+                self.__edge_next=np.concatenate((self.__edge_next,np.zeros(len(self.__edge_next),dtype=np.int32)))
+            edge=self.__edge_count
+            self.__edge_count+=1
+        self.__edge_target[edge]=target
+        self.__edge_next[edge]=-1
+        return edge
+
+    ##Creates a new node
+    #@param synset The synset object (or string) the node holds
+    #@returns an ArenaNode view of the new node
+    def node(self,synset):
+        self.__growNodes()
+        index=self.__size
+        self.__size+=1
+        key=(type(synset),synset)
+        if key not in self.__synset_ids:
+            self.__synset_ids[key]=len(self.__synsets)
+            self.__synsets.append(synset)
+        self.__synset[index]=self.__synset_ids[key]
+        if isinstance(synset,str):
+            self.__sense[index]=-1
+        else:
+            self.__sense[index]=int(synset.name().split(".")[2]) #For synset senses
+        self.__number[index]=UNNUMBERED
+        self.__post_number[index]=UNNUMBERED
+        self.__parent_state[index]=0
+        self.__child_state[index]=0
+        self.__parent_head[index]=-1
+        self.__parent_tail[index]=-1
+        self.__child_head[index]=-1
+        self.__child_tail[index]=-1
+        self.__score_length[index]=0
+        return ArenaNode(self,index)
+
+    ##Copies a WordNetNode into the arena. Its synset, scores, properties and number are kept, but not its links
+    #@param wnn The WordNetNode to copy
+    #@returns an ArenaNode view of the new node
+    def adopt(self,wnn):
+        node=self.node(wnn.getSynSet())
+        node.setScore(list(wnn.getScore()))
+        if len(wnn.getProperties()) > 0:
+            node.setProperties(wnn.getProperties())
+        node.setNumber(wnn.getNumber())
+        return node
+
+    ##Gets a view of a node
+    #@param index The position of the node in the arena
+    #@returns an ArenaNode
+    def view(self,index):
+        return ArenaNode(self,index)
+
+    ##Turns a value into an edge target
+    def __encode(self,value):
+        if isinstance(value,ArenaNode) and value.arena is self:
+            return value.index
+        slot=self.__foreign_slots.get(id(value))
+        if slot is None:
+            if len(self.__free_foreign) > 0:
+                slot=self.__free_foreign.pop()
+                self.__foreign[slot]=value
+                self.__foreign_refs[slot]=0
+            else:
+                slot=len(self.__foreign)
+                self.__foreign.append(value)
+                self.__foreign_refs.append(0)
+            self.__foreign_slots[id(value)]=slot
+        self.__foreign_refs[slot]+=1
+        return -slot-1
+
+    ##Puts an edge back in the pool, letting go of its target if that is a foreign value
+    def __freeEdge(self,edge):
+        target=int(self.__edge_target[edge])
+        if target < 0:
+            slot=-target-1
+            self.__foreign_refs[slot]-=1
+            if self.__foreign_refs[slot] == 0:
+                del self.__foreign_slots[id(self.__foreign[slot])]
+                self.__foreign[slot]=None
+                self.__free_foreign.append(slot)
+        self.__edge_target[edge]=0
+        self.__edge_next[edge]=self.__free_edge
+        self.__free_edge=edge
+
+    ##Turns an edge target back into a value
+    def __decode(self,target):
+        if target >= 0:
+            return ArenaNode(self,target)
+        return self.__foreign[-target-1]
+
+    ##Tests if an edge target is (equal to) a value
+    def __matches(self,target,value):
+        if isinstance(value,ArenaNode) and value.arena is self:
+            return target == value.index
+        return target < 0 and self.__foreign[-target-1] == value
+
+    ##The encoded targets of a linked list of edges
+    def __targets(self,edge):
+        targets=[]
+        while edge >= 0:
+            targets.append(int(self.__edge_target[edge]))
+            edge=int(self.__edge_next[edge])
+        return targets
+
+    ##Appends an edge to a linked list
+    #@returns the new (head,tail)
+    def __append(self,head,tail,target):
+        edge=self.__newEdge(target)
+        if tail < 0:
+            return (edge,edge)
+        self.__edge_next[tail]=edge
+        return (head,edge)
+
+    ##Removes the edges of a linked list that match a value
+    #@param first If true only the first match is removed (as list.remove), otherwise all of them are
+    #@returns the new (head,tail)
+    def __remove(self,head,tail,value,first):
+        previous=-1
+        edge=head
+        while edge >= 0:
+            following=int(self.__edge_next[edge])
+            if self.__matches(int(self.__edge_target[edge]),value):
+                if previous < 0:
+                    head=following
+                else:
+                    self.__edge_next[previous]=following
+                if edge == tail:
+                    tail=previous
+                self.__freeEdge(edge)
+                if first:
+                    break
+            else:
+                previous=edge
+            edge=following
+        return (head,tail)
+
+    ##Releases a whole linked list of edges
+    def __release(self,head):
+        while head >= 0:
+            following=int(self.__edge_next[head])
+            self.__freeEdge(head)
+            head=following
+
+    ##Gets the synset (or string) of a node
+    def synset(self,index):
+        return self.__synsets[self.__synset[index]]
+
+    ##Gets the sense of a node
+    def sense(self,index):
+        return int(self.__sense[index])
+
+    ##Gets the number of a node, or None
+    def number(self,index):
+        if self.__number[index] == UNNUMBERED:
+            return None
+        return int(self.__number[index])
+
+    ##Sets the number of a node (None clears it)
+    def setNumber(self,index,number):
+        self.__number[index]=UNNUMBERED if number is None else number
+
+    ##Gets the post number of a node, or None
+    def postNumber(self,index):
+        if self.__post_number[index] == UNNUMBERED:
+            return None
+        return int(self.__post_number[index])
+
+    ##Sets the post number of a node (None clears it)
+    def setPostNumber(self,index,number):
+        self.__post_number[index]=UNNUMBERED if number is None else number
+
+    ##Gets the children of a node
+    #@returns a list of children, or None if the node never had any
+    def children(self,index):
+        if self.__child_state[index] == 0:
+            return None
+        return [self.__decode(target) for target in self.__targets(int(self.__child_head[index]))]
+
+    ##Adds a child to the end of the children of a node
+    def appendChild(self,index,value):
+        (head,tail)=self.__append(int(self.__child_head[index]),int(self.__child_tail[index]),self.__encode(value))
+        self.__child_head[index]=head
+        self.__child_tail[index]=tail
+        self.__child_state[index]=1
+
+    ##Removes the first child of a node equal to a value
+    def removeChild(self,index,value):
+        (head,tail)=self.__remove(int(self.__child_head[index]),int(self.__child_tail[index]),value,True)
+        self.__child_head[index]=head
+        self.__child_tail[index]=tail
+
+    ##Gets the parent of a node
+    #@returns None, the parent, or a list of parents (the same way WordNetNode.getParent does)
+    def parent(self,index):
+        state=self.__parent_state[index]
+        if state == 0:
+            return None
+        parents=[self.__decode(target) for target in self.__targets(int(self.__parent_head[index]))]
+        if state == 1:
+            return parents[0]
+        return parents
+
+    ##Replaces the parent of a node (None removes it)
+    def setParent(self,index,value):
+        self.__release(int(self.__parent_head[index]))
+        self.__parent_head[index]=-1
+        self.__parent_tail[index]=-1
+        if value is None:
+            self.__parent_state[index]=0
+        else:
+            edge=self.__newEdge(self.__encode(value))
+            self.__parent_head[index]=edge
+            self.__parent_tail[index]=edge
+            self.__parent_state[index]=1
+
+    ##Replaces the parent of a node with a list of parents (which stays a list even with one parent)
+    def setParents(self,index,values):
+        self.setParent(index,None)
+        for value in values:
+            self.appendParent(index,value)
+        self.__parent_state[index]=2
+
+    ##Adds a parent to a node, turning a single parent into a list of parents
+    def appendParent(self,index,value):
+        (head,tail)=self.__append(int(self.__parent_head[index]),int(self.__parent_tail[index]),self.__encode(value))
+        self.__parent_head[index]=head
+        self.__parent_tail[index]=tail
+        self.__parent_state[index]=2
+
+    ##Removes a parent from a node. A single parent equal to the value is removed, and every parent in a list
+    #equal to the value is taken out of the list (which stays a list)
+    def removeParent(self,index,value):
+        state=self.__parent_state[index]
+        if state == 1:
+            if self.__matches(int(self.__edge_target[self.__parent_head[index]]),value):
+                self.setParent(index,None)
+        elif state == 2:
+            (head,tail)=self.__remove(int(self.__parent_head[index]),int(self.__parent_tail[index]),value,False)
+            self.__parent_head[index]=head
+            self.__parent_tail[index]=tail
+
+    ##Gets the scores of a node
+    #@returns a list of the scores
+    def scores(self,index):
+        if index in self.__score_lists:
+            return self.__score_lists[index]
+        length=self.__score_length[index]
+        return [int(value) if is_int else float(value) for value,is_int in zip(self.__score[index,:length],self.__score_is_int[index,:length])]
+
+    ##Replaces all the scores of a node
+    def setScores(self,index,scores):
+        self.__score_lists.pop(index,None)
+        if not all(self.__isNumber(score) for score in scores):
+            self.__score_lists[index]=scores
+            self.__score_length[index]=0
+            return None
+        self.__growScores(len(scores))
+        self.__score[index,:len(scores)]=scores
+        self.__score_is_int[index,:len(scores)]=[isinstance(score,numbers.Integral) for score in scores]
+        self.__score_length[index]=len(scores)
+
+    ##Adds a score to the end of the scores of a node
+    def appendScore(self,index,score):
+        if index in self.__score_lists or not self.__isNumber(score):
+            self.setScores(index,self.scores(index)+[score])
+            return None
+        length=self.__score_length[index]
+        self.__growScores(length+1)
+        self.__score[index,length]=score
+        self.__score_is_int[index,length]=isinstance(score,numbers.Integral)
+        self.__score_length[index]=length+1
+
+    ##Only real numbers go into the score matrix (numpy scalars count as numbers.Real, bools are kept as they are)
+    @staticmethod
+    def __isNumber(score):
+        return isinstance(score,numbers.Real) and not isinstance(score,(bool,np.bool_))
+
+    ##Gets the properties of a node
+    def properties(self,index):
+        if index not in self.__properties:
+            self.__properties[index]=[]
+        return self.__properties[index]
+
+    ##Sets the properties of a node
+    def setProperties(self,index,properties):
+        self.__properties[index]=properties
+
+    ##Gets the forest indexing a node
+    def forest(self,index):
+        return self.__forests.get(index)
+
+    ##Sets the forest indexing a node (None removes it)
+    def setForest(self,index,forest):
+        if forest is None:
+            self.__forests.pop(index,None)
+        else:
+            self.__forests[index]=forest
+
+    ##Builds CSR arrays out of the child (or parent) lists of every node
+    #@param children True for the children, False for the parents
+    #@returns a tuple of (indptr,indices). Targets that are not nodes of this arena are given as -1
+    def __csr(self,children):
+        heads=self.__child_head if children else self.__parent_head
+        indptr=np.zeros(self.__size+1,dtype=np.int64)
+        indices=[]
+        for index in range(self.__size):
+            indices.extend(self.__targets(int(heads[index])))
+            indptr[index+1]=len(indices)
+        indices=np.array(indices,dtype=np.int32)
+        indices[indices < 0]=-1
+        return (indptr,indices)
+
+    ##The children of every node as CSR arrays
+    #@returns a tuple of (indptr,indices), where the children of node i are indices[indptr[i]:indptr[i+1]]
+    def childCSR(self):
+        return self.__csr(True)
+
+    ##The parents of every node as CSR arrays
+    #@returns a tuple of (indptr,indices), where the parents of node i are indices[indptr[i]:indptr[i+1]]
+    def parentCSR(self):
+        return self.__csr(False)
+
+    ##The number of bytes used by the arrays of the arena
+    def nbytes(self):
+        return sum(value.nbytes for value in self.__dict__.itervalues() if isinstance(value,np.ndarray))
+
+##A view of a node in a NodeArena that can be used anywhere a WordNetNode is. The view only holds the arena
+#and the position of the node, so two views of the same node are equal
+class ArenaNode(WordNetNode):
+    ##Creates the view. Use NodeArena.node to create a new node
+    #@param arena The arena holding the node
+    #@param index The position of the node in the arena
+    def __init__(self,arena,index):
+        ##The arena holding the node
+        self.arena=arena
+
+        ##The position of the node in the arena
+        self.index=index
+
+    def __eq__(self,other):
+        return isinstance(other,ArenaNode) and other.arena is self.arena and other.index == self.index
+
+    def __ne__(self,other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash((id(self.arena),self.index))
+
+    ##Returns the name of the node
+    def __str__(self):
+        synset=self.getSynSet()
+        if isinstance(synset,str):
+            my_string=synset
+        else:
+            my_string=synset.name()
+        return my_string.split(".")[0]
+
+    ##Attaches a node as a child node
+    #@param node The node to attach to this node
+    #@param recip If set to True, attaches the child to the parent
+    def attachChild(self,node,recip = True,multi = False):
+        if node is not None:
+            self.arena.appendChild(self.index,node)
+            if recip:
+                node.attachToParent(self,multi=multi)
+            linkForest(self,node)
+
+    ##Removes a child from the list if it exists
+    def removeChild(self,node):
+        if node is not None and node in (self.getChildren() or []):
+            self.arena.removeChild(self.index,node)
+            unlinkForest(self,node)
+
+    ##Removes a parent from the list if it exists
+    def removeParent(self,node):
+        parent=self.getParent()
+        if node is not None and (node == parent or (isinstance(parent,list) and node in parent)):
+            self.arena.removeParent(self.index,node)
+            unlinkForest(node,self)
+
+    ##Attaches itself to a parent
+    #@param node The parent node, or a list of parent nodes which replaces the current parent
+    def attachToParent(self,node,multi=False):
+        if isinstance(node,list):
+            self.arena.setParents(self.index,node)
+        elif not multi or node is None or self.getParent() is None:
+            self.arena.setParent(self.index,node)
+        else:
+            self.arena.appendParent(self.index,node)
+
+    ##Returns the parent if one exists
+    #@param pos The position of the parent in the list
+    def getParent(self,pos = -1):
+        parent=self.arena.parent(self.index)
+        if pos == -1 or not isinstance(parent,list):
+            return parent
+        return parent[pos]
+
+    ##Returns the children of the node as a list, or None if this node has no children
+    def getChildren(self):
+        return self.arena.children(self.index)
+
+    ##Returns the Synset in question
+    def getSynSet(self):
+        return self.arena.synset(self.index)
+
+    ##The getter for the sense of the node
+    def getSense(self):
+        return self.arena.sense(self.index)
+
+    ##The getter for the number of the node
+    def getNumber(self):
+        return self.arena.number(self.index)
+
+    ##Gives the node a number
+    def setNumber(self,number):
+        self.arena.setNumber(self.index,number)
+
+    ##The getter for the post number of the node
+    def getPostNumber(self):
+        return self.arena.postNumber(self.index)
+
+    ##Gives the node a post number
+    def setPostNumber(self,number):
+        self.arena.setPostNumber(self.index,number)
+
+    ##Views of the same node are told apart by their position in the arena
+    def identity(self):
+        return (id(self.arena),self.index)
+
+    ##The getter for the forest indexing the node
+    def getForest(self):
+        return self.arena.forest(self.index)
+
+    ##Sets the forest indexing the node
+    def setForest(self,forest):
+        self.arena.setForest(self.index,forest)
+
+    ##Gets a score (or all the scores) of the node, the same way WordNetNode.getScore does
+    def getScore(self,pos=-1):
+        scores=self.arena.scores(self.index)
+        if pos >= len(scores) and pos == 0:
+            return 0.0
+        if pos < 0 or pos >= len(scores):
+            return scores
+        return scores[pos]
+
+    ##Sets the scores of the node, the same way WordNetNode.setScore does
+    def setScore(self,score,replace = False):
+        if isinstance(score,list):
+            self.arena.setScores(self.index,score)
+        elif not replace:
+            self.arena.appendScore(self.index,score)
+        else:
+            self.arena.setScores(self.index,[score])
+
+    ##The getter for the properties of the node
+    def getProperties(self):
+        return self.arena.properties(self.index)
+
+    ##The setter for the properties of the node
+    def setProperties(self,properties):
+        self.arena.setProperties(self.index,properties)
+
+    ##Gives the children of this node to another node
+    def copy(self,node):
+        if node == self:
+            return None
+        children=self.getChildren()
+        if node in children:
+            for child in children:
+                if child != node:
+                    node.attachChild(child)
+        for child in children:
+            node.attachChild(child)
+        return None
+
+
+##Keeps a synset=>node index over a forest of WordNetNodes. Nodes join the forest when they are added, or when they
+#are linked (by attachChild) to a node that is already in it, and they leave it once removeChild and removeParent
+#have cut them off from every parent. The index is kept up to date as the links change, so finding the node of a
+#synset never searches the trees
+class WordNetForest:
+    ##Creates an empty forest
+    #@param arena (Defaults to None) The NodeArena new nodes are made in. None makes WordNetNode objects
+    def __init__(self,arena = None):
+        ##The store new nodes are made in
+        self.arena=arena
+
+        ##identity=>node for every node in the forest
+        self.__members={}
+
+        ##The nodes in the order they joined the forest (removed nodes are skipped when read)
+        self.__order=[]
+
+        ##key=>list of the nodes holding that synset, the first being the one lookups give
+        self.__index={}
+
+        ##identity=>set of the identities of the parents linking to the node
+        self.__links={}
+
+        ##The identities of the nodes added as roots, which stay in the forest when they lose their parents
+        self.__pinned=set()
+
+    ##The key a synset (or string) is indexed by, the same as buildWordNetForest has always used
+    #@param synset The synset or string
+    #@returns the key
+    @staticmethod
+    def key(synset):
+        return str(synset)
+
+    ##Finds the node holding a synset
+    #@param synset The synset (or string) to look for
+    #@returns the node, or None if the synset is not in the forest
+    def find(self,synset):
+        nodes=self.__index.get(self.key(synset))
+        if nodes is None:
+            return None
+        return nodes[0]
+
+    ##Finds the node holding a synset among a node of the forest and everything under it. Only the links above the
+    #nodes holding the synset are followed. If more than one node under it holds the synset, the one that joined the
+    #forest first is given
+    #@param root The node of the forest to look under
+    #@param synset The synset, which must be the object the node holds (as findSynset tests)
+    #@returns the node, or None if no node under root holds the synset
+    def findUnder(self,root,synset):
+        target=root.identity()
+        for node in self.__index.get(self.key(synset),()):
+            if node.getSynSet() is not synset:
+                continue
+            stack=[node.identity()]
+            seen=set()
+            while len(stack) > 0:
+                identity=stack.pop()
+                if identity == target:
+                    return node
+                if identity not in seen:
+                    seen.add(identity)
+                    stack.extend(self.__links.get(identity,()))
+        return None
+
+    def __contains__(self,synset):
+        return self.key(synset) in self.__index
+
+    def __len__(self):
+        return len(self.__members)
+
+    ##Goes through the nodes in the order they joined the forest
+    def __iter__(self):
+        for node in self.__order:
+            if self.__members.get(node.identity()) is node:
+                yield node
+
+    ##Gets the node of a synset, making it if the synset is not in the forest yet. This lets callers
+    #build a forest with one node per synset instead of merging duplicates afterwards
+    #@param synset The synset (or string)
+    #@returns a tuple of (node,True if the node was just made)
+    def node(self,synset):
+        found=self.find(synset)
+        if found is not None:
+            return (found,False)
+        if self.arena is not None:
+            node=self.arena.node(synset)
+        else:
+            node=WordNetNode(synset)
+        self.__join(node)
+        return (node,True)
+
+    ##Adds a node (and everything under it) to the forest as a root
+    #@param node The node to add
+    def add(self,node):
+        self.__pinned.add(node.identity())
+        self.__joinLinked(node)
+
+    ##The roots of the forest (nodes no parent in the forest links to), in the order they joined
+    #@returns a list of nodes
+    def getRoots(self):
+        return [node for node in self if len(self.__links[node.identity()]) == 0]
+
+    ##The synsets held by more than one node
+    #@returns a dictionary of key=>list of nodes
+    def duplicates(self):
+        return dict((key,nodes) for key,nodes in self.__index.iteritems() if len(nodes) > 1)
+
+    ##Puts a single node in the index
+    #@returns True if the node was not in the forest before
+    def __join(self,node):
+        identity=node.identity()
+        if identity in self.__members:
+            return False
+        self.__members[identity]=node
+        self.__order.append(node)
+        self.__index.setdefault(self.key(node.getSynSet()),[]).append(node)
+        self.__links[identity]=set()
+        node.setForest(self)
+        return True
+
+    ##Puts a node in the index along with everything linked to it (above or below) that is not in the forest yet.
+    #Only the nodes that join are looked at, so a node that is already in the forest costs nothing
+    def __joinLinked(self,node):
+        if not self.__join(node):
+            return None
+        stack=[node]
+        while len(stack) > 0:
+            current=stack.pop()
+            for child in childList(current):
+                if self.__join(child):
+                    stack.append(child)
+                self.__links[child.identity()].add(current.identity())
+            parents=current.getParent()
+            if not isinstance(parents,list):
+                parents=[parents]
+            for parent in parents:
+                if isinstance(parent,WordNetNode) and current in (parent.getChildren() or []):
+                    if self.__join(parent):
+                        stack.append(parent)
+                    self.__links[current.identity()].add(parent.identity())
+
+    ##Takes a node out of the index
+    def __leave(self,node):
+        identity=node.identity()
+        del self.__members[identity]
+        del self.__links[identity]
+        self.__pinned.discard(identity)
+        key=self.key(node.getSynSet())
+        nodes=[i for i in self.__index[key] if i.identity() != identity]
+        if len(nodes) > 0:
+            self.__index[key]=nodes
+        else:
+            del self.__index[key]
+        node.setForest(None)
+
+    ##Called by attachChild when a parent and child are linked
+    def linked(self,parent,child):
+        self.__joinLinked(parent)
+        self.__joinLinked(child)
+        self.__links[child.identity()].add(parent.identity())
+
+    ##Called by removeChild and removeParent when a parent and child are no longer linked. A node
+    #that has lost all of its parents leaves the forest along with anything only it linked to
+    def unlinked(self,parent,child):
+        identity=child.identity()
+        if identity not in self.__members or not isinstance(parent,WordNetNode):
+            return None
+        if parent.identity() not in self.__links[identity]:
+            return None
+        self.__links[identity].discard(parent.identity())
+        if len(self.__links[identity]) > 0 or identity in self.__pinned:
+            return None
+        stack=[child]
+        while len(stack) > 0:
+            node=stack.pop()
+            if node.identity() not in self.__members:
+                continue
+            self.__leave(node)
+            for grandchild in childList(node):
+                links=self.__links.get(grandchild.identity())
+                if links is not None:
+                    links.discard(node.identity())
+                    if len(links) == 0 and grandchild.identity() not in self.__pinned:
+                        stack.append(grandchild)
+
+##Tells the forest of either node that they have been linked
+#@param parent The parent node
+#@param child The child node
+def linkForest(parent,child):
+    forest=parent.getForest()
+    if forest is None and isinstance(child,WordNetNode):
+        forest=child.getForest()
+    if forest is not None:
+        forest.linked(parent,child)
+
+##Tells the forest of the child that a link has been cut
+#@param parent The parent node
+#@param child The child node
+def unlinkForest(parent,child):
+    if isinstance(child,WordNetNode) and child.getForest() is not None:
+        child.getForest().unlinked(parent,child)
+
 ##Performs a BFS on a given group of nodes, starting from the root node and
 #traversing all of the children, giving each node a number
 #@param root The starting node for the system
 #@param start_number The number to start counting at
 #@returns the end value of the counter  
 def breadthFirstSearch(root,start_number):
-    nodes=[root]
     if root.getNumber() == None:
         root.setNumber(start_number)
         counter=start_number+1
     else:
         counter=root.getNumber()
-    seen_list=[]
-    while len(nodes) > 0:
-            #Get the next node in the system
-            node=nodes.pop(0)
-            seen_list.append(node)
-            #Add all the child nodes to the system
-            children=node.getChildren()
-            if children is not None:
-                for child in children:
-                    if child not in seen_list:
-                        nodes.append(child)
-            if node.getNumber() == None:
-                #Add the node to the list of nodes
-                node.setNumber(counter)
-                #Finally, increment the counter
-                counter+=1
-    return counter
+    return numberBreadthFirst(root,counter)
 ##Performs a BFS on a forest of rooted trees
 #@param roots A list (Note that this has to be a list) of roots
 #@param start number the number to start on
@@ -286,80 +1069,85 @@ def breadthFirstSearch(root,start_number):
 def breadthFirstForestSearch(roots,start_number):
     if not isinstance(roots,list):
         return start_number
-    nodes = roots
-    seen_list=[] #Shouldn't matter because we have no cycles
-    while len(nodes) > 0:
-        #Get the next node in the system
-            node=nodes.pop(0)
-            seen_list.append(node)
-            #Add all the child nodes to the system
-            children=node.getChildren()
-            if children is not None:
-                for child in children:
-                    if child not in seen_list:
-                        nodes.append(child)
-            if node.getNumber() == None:
-                #Add the node to the list of nodes
-                node.setNumber(counter)
-                #Finally, increment the counter
-                counter+=1
-    return counter
-## Combines all information of WordNetNodes stored in root to the highest level, in place
+    return numberBreadthFirst(roots,start_number)
+##The properties of a node split into channels. ALET stores its properties as a tuple of (adverb roles,object roles),
+#and each part is combined on its own. Plain list properties are a single channel
+#@param properties The properties of a node
+#@param width The number of channels, or None for plain list properties
+#@returns a list of sets, one for each channel
+def propertyChannels(properties,width):
+    if width is None:
+        if isinstance(properties,list):
+            return [set(properties)]
+        return [set()]
+    if isinstance(properties,tuple):
+        if len(properties) != width:
+            raise ValueError("Properties have "+str(len(properties))+" parts, expected "+str(width))
+        return [set(channel) for channel in properties]
+    if len(properties) == 0:
+        return [set() for i in range(width)]
+    raise ValueError("Cannot combine list properties with tuple properties")
+
+##Takes the properties of a parent off of a child
+#@param child The child node
+#@param parent The combined properties of the parent, as channels
+#@param width The number of channels, or None for plain list properties
+def removeParentProperties(child,parent,width):
+    properties=child.getProperties()
+    if isinstance(properties,list) and len(properties) > 0:
+        if width is None:
+            child.setProperties([x for x in properties if x not in parent[0]])
+    elif width is not None and isinstance(properties,tuple):
+        channels=[]
+        for channel,found in zip(properties,parent):
+            if isinstance(channel,(set,frozenset)):
+                channels.append(channel-found)
+            else:
+                channels.append([x for x in channel if x not in found])
+        child.setProperties(tuple(channels))
+
+## Combines all information of WordNetNodes stored in root to the highest level, in place. A property shared by all the
+#children of a node is moved onto the node, and anything a node has is taken off of its children. This is done in a single
+#post-order pass over the whole forest, so each node is visited once even when it has many parents. The properties are
+#kept as sets: a node only has a handful, so the time goes to visiting the nodes, and interning them into int bit masks
+#(even with a table made for each call) was slower, since every mask has to be built and turned back one property at a time
 #  @param roots The roots of all WordNetNodes tree
 def treePropertyCleanUp(roots):
-    #TODO: This code could be streamlined to start at the leaf nodes and simply work our way up
-    #BFS search to get all the nodes into a stack (bottom up BFS search)
-    for root in roots:
-        stack = []
-        bfs = [root]
-        seen_list = []
-        while len(bfs) > 0:
-            top = bfs.pop(0)
-            if top not in seen_list:
-                seen_list.append(top)
-                stack.insert(0,top)
-                children = top.getChildren()
-                if children is not None:
-                    for child in children:
-                        if child not in seen_list:
-                            bfs.append(child)
-        seen_list = []
-        #Here, we have the stack, and so we combine properties from our bottom up BFS stack
-        while len(stack) > 0:
-            top = stack.pop(0)
-            parents = top.getParent()
-            if isinstance(parents,list):
-                for parent in parents:
-                    if parent not in seen_list:
-                        #TODO:Lets pop off the children because they have already been seen (and we should be in order because reverse)
-                        parent.combineProperties()
-                        seen_list.append(parent)
-            else:
-                if parents is not None and parents not in seen_list:
-                    parents.combineProperties()
-                    seen_list.append(parents)
-        #Finally, we clear out any repeat properties
-        pars = list(set(map(lambda x:x,root.getSinks())))
-        while len(pars) > 0:
-            top = pars.pop(0)
-            if top is not None:
-                if isinstance(top,list):
-                    for t in top:
-                        t.removePropertiesFromChildren()
-                        if t.getParent() is not None:
-                            if isinstance(t.getParent(),list):
-                                pars.extend(t.getParent())
-                            else:
-                                pars.append(t.getParent())
+    nodes=list(postOrder(roots))
+    width=None
+    for node in nodes:
+        if isinstance(node.getProperties(),tuple):
+            width=len(node.getProperties())
+            break
+    #The properties of each node right after it was combined, which is what its parents combine and what is taken off of its children
+    combined={}
+    for node in nodes:
+        children=childList(node)
+        channels=propertyChannels(node.getProperties(),width)
+        if len(children) > 0:
+            shared=None
+            for child in children:
+                child_channels=combined[child.identity()]
+                if shared is None:
+                    shared=[set(channel) for channel in child_channels]
                 else:
-                    top.removePropertiesFromChildren()
-                    if top.getParent() is not None:
-                        if isinstance(top.getParent(),list):
-                            pars.extend(top.getParent())
-                        else:
-                            pars.append(top.getParent())
-        
-    
-    
-
-            
+                    for channel,child_channel in zip(shared,child_channels):
+                        channel&=child_channel
+                if not any(shared):
+                    break
+            if width is None:
+                properties=node.getProperties()
+                if isinstance(properties,list) and len(properties) > 0:
+                    #The node keeps what it has (as combineProperties does)
+                    if len(shared[0].intersection(properties)) > 0:
+                        node.setProperties(list(set(properties)))
+                else:
+                    node.setProperties(list(shared[0]))
+            else:
+                #Each channel the node has nothing in takes what all the children share
+                channels=[channel if len(channel) > 0 else found for channel,found in zip(channels,shared)]
+                node.setProperties(tuple(channels))
+            channels=propertyChannels(node.getProperties(),width)
+            for child in children:
+                removeParentProperties(child,channels,width)
+        combined[node.identity()]=channels
@@ -0,0 +1,232 @@
+###############################################################################
+##ForestFile.py
+##Last Modified: 10-18-2026
+##
+##Saves a generated forest (such as the one from buildWordNetForest) in the
+##BinaryFormat layout and opens it again without rebuilding any nodes. Nodes
+##are stored in depth first order as a parent index, CSR child and parent
+##arrays, numbers and post numbers, and properties, with every synset name,
+##word and property kept once in a string table. ForestFile reads the arrays
+##lazily through numpy.memmap, so a simulation can open an ontology in a few
+##milliseconds and share it between processes
+###############################################################################
+import numpy as np
+from BinaryFormat import writeArrays,BinaryFile,StringTable,readString
+from Traversal import depthFirst,childList
+
+##The kind stored in the header of a forest file
+FOREST_KIND="forest"
+
+##The node holds a synset (otherwise it holds a word)
+SYNSET_FLAG=1
+
+##getParent gives a list of parents (a multi-parent node)
+PARENT_LIST_FLAG=2
+
+##The properties are a tuple of channels (as ALET uses) rather than a list
+PROPERTY_TUPLE_FLAG=4
+
+##Builds a CSR layout out of a list of lists
+#@param rows A list of lists of integers
+#@returns a tuple of (indptr,indices)
+def csr(rows):
+    indptr=np.zeros(len(rows)+1,dtype=np.int64)
+    indptr[1:]=np.cumsum([len(row) for row in rows])
+    indices=np.zeros(int(indptr[-1]),dtype=np.int32)
+    for i,row in enumerate(rows):
+        indices[indptr[i]:indptr[i+1]]=row
+    return (indptr,indices)
+
+##Turns a number that may be None into an integer, with -1 standing for None
+def packNumber(number):
+    if number is None:
+        return -1
+    return number
+
+##Saves a forest to a file
+#@param roots A root node or a list of root nodes
+#@param path The file to write
+#@param meta (Defaults to None) A dictionary of extra values (anything json can store) kept with the forest
+#@returns the number of nodes saved
+def saveForest(roots,path,meta = None):
+    if not isinstance(roots,list):
+        roots=[roots]
+    nodes=list(depthFirst(roots))
+    index=dict((node.identity(),i) for i,node in enumerate(nodes))
+    strings=StringTable()
+    names=np.zeros(len(nodes),dtype=np.int32)
+    flags=np.zeros(len(nodes),dtype=np.uint8)
+    parent=np.zeros(len(nodes),dtype=np.int32)
+    numbers=np.zeros(len(nodes),dtype=np.int64)
+    post_numbers=np.zeros(len(nodes),dtype=np.int64)
+    children=[]
+    parents=[]
+    properties=[]
+    channels=[]
+    for i,node in enumerate(nodes):
+        synset=node.getSynSet()
+        if isinstance(synset,basestring):
+            names[i]=strings.intern(synset)
+        else:
+            names[i]=strings.intern(synset.name())
+            flags[i]|=SYNSET_FLAG
+        found=node.getParent()
+        if isinstance(found,list):
+            flags[i]|=PARENT_LIST_FLAG
+        else:
+            found=[] if found is None else [found]
+        #Parents outside the saved forest are left out
+        parents.append([index[p.identity()] for p in found if p.identity() in index])
+        parent[i]=parents[-1][0] if len(parents[-1]) > 0 else -1
+        children.append([index[child.identity()] for child in childList(node)])
+        numbers[i]=packNumber(node.getNumber())
+        post_numbers[i]=packNumber(node.getPostNumber())
+        props=node.getProperties()
+        if isinstance(props,tuple):
+            flags[i]|=PROPERTY_TUPLE_FLAG
+            channels.append(len(props))
+            properties.append([(c,strings.intern(prop)) for c,channel in enumerate(props) for prop in channel])
+        else:
+            channels.append(0)
+            properties.append([(0,strings.intern(prop)) for prop in (props or [])])
+    (child_indptr,child_indices)=csr(children)
+    (parent_indptr,parent_indices)=csr(parents)
+    (property_indptr,property_names)=csr([[name for (c,name) in props] for props in properties])
+    (_,property_channels)=csr([[c for (c,name) in props] for props in properties])
+    (string_offsets,string_data)=strings.arrays()
+    writeArrays(path,FOREST_KIND,{"names":names,
+                                  "flags":flags,
+                                  "parent":parent,
+                                  "roots":np.array([index[root.identity()] for root in roots],dtype=np.int32),
+                                  "child_indptr":child_indptr,
+                                  "child_indices":child_indices,
+                                  "parent_indptr":parent_indptr,
+                                  "parent_indices":parent_indices,
+                                  "numbers":numbers,
+                                  "post_numbers":post_numbers,
+                                  "channels":np.array(channels,dtype=np.int32),
+                                  "property_indptr":property_indptr,
+                                  "property_names":property_names,
+                                  "property_channels":property_channels.astype(np.int8),
+                                  "string_offsets":string_offsets,
+                                  "string_data":string_data},meta)
+    return len(nodes)
+
+##A forest saved by saveForest, read lazily. Nodes are referred to by their position in the file
+class ForestFile:
+    ##Opens a forest file. Only the header is read here
+    #@param path The file to open
+    #@param mmap (Defaults to True) If true the arrays are memory mapped, otherwise they are read into memory
+    def __init__(self,path,mmap = True):
+        ##The underlying file
+        self.file=BinaryFile(path,FOREST_KIND,mmap)
+
+        ##The extra values saved with the forest
+        self.meta=self.file.meta
+
+        ##name=>position of the first node with that name, filled in on first use
+        self.__positions=None
+
+    def __len__(self):
+        return len(self.file["names"])
+
+    ##The positions of the roots
+    def roots(self):
+        return self.file["roots"].tolist()
+
+    ##The name of a node, which is the synset name (i.e. "walk.v.01") or the word
+    def name(self,position):
+        return readString(self.file["string_offsets"],self.file["string_data"],int(self.file["names"][position]))
+
+    ##Tests if a node holds a synset rather than a word
+    def isSynset(self,position):
+        return bool(self.file["flags"][position] & SYNSET_FLAG)
+
+    ##Gets the synset of a node (or the word when the node holds one)
+    def synset(self,position):
+        if self.isSynset(position):
+            from nltk.corpus import wordnet as wn
+            return wn.synset(self.name(position))
+        return self.name(position)
+
+    ##The positions of the children of a node
+    def children(self,position):
+        indptr=self.file["child_indptr"]
+        return self.file["child_indices"][indptr[position]:indptr[position+1]]
+
+    ##The positions of the parents of a node
+    def parents(self,position):
+        indptr=self.file["parent_indptr"]
+        return self.file["parent_indices"][indptr[position]:indptr[position+1]]
+
+    ##The position of the (first) parent of a node, or -1 for a root
+    def parent(self,position):
+        return int(self.file["parent"][position])
+
+    ##The number of a node, or None if it was never numbered
+    def number(self,position):
+        number=int(self.file["numbers"][position])
+        return None if number == -1 else number
+
+    ##The post number of a node, or None if it was never given one
+    def postNumber(self,position):
+        number=int(self.file["post_numbers"][position])
+        return None if number == -1 else number
+
+    ##The properties of a node, as a list, or a tuple of sets when they were saved as a tuple
+    def properties(self,position):
+        indptr=self.file["property_indptr"]
+        (start,stop)=(int(indptr[position]),int(indptr[position+1]))
+        offsets=self.file["string_offsets"]
+        data=self.file["string_data"]
+        names=[readString(offsets,data,i) for i in self.file["property_names"][start:stop]]
+        if not self.file["flags"][position] & PROPERTY_TUPLE_FLAG:
+            return names
+        parts=[set() for i in range(int(self.file["channels"][position]))]
+        for channel,name in zip(self.file["property_channels"][start:stop],names):
+            parts[channel].add(name)
+        return tuple(parts)
+
+    ##Finds the first node (in depth first order) with a name
+    #@param name The synset name or word
+    #@returns the position of the node, or None if there is no such node
+    def find(self,name):
+        if self.__positions is None:
+            self.__positions={}
+            for position in range(len(self)-1,-1,-1):
+                self.__positions[self.name(position)]=position
+        return self.__positions.get(name)
+
+    ##Rebuilds the forest as nodes
+    #@param arena (Defaults to None) The NodeArena to create the nodes in. None creates WordNetNode objects
+    #@returns a list of the root nodes
+    def toNodes(self,arena = None):
+        from DataStructures import WordNetNode
+        flags=self.file["flags"]
+        if arena is None:
+            nodes=[WordNetNode(self.synset(i)) for i in range(len(self))]
+        else:
+            nodes=[arena.node(self.synset(i)) for i in range(len(self))]
+        for i,node in enumerate(nodes):
+            for child in self.children(i):
+                node.attachChild(nodes[child],False)
+            parents=[nodes[p] for p in self.parents(i)]
+            if flags[i] & PARENT_LIST_FLAG:
+                node.attachToParent(parents)
+            elif len(parents) > 0:
+                node.attachToParent(parents[0])
+            node.setNumber(self.number(i))
+            node.setPostNumber(self.postNumber(i))
+            node.setProperties(self.properties(i))
+        return [nodes[root] for root in self.roots()]
+
+##Opens a forest saved by saveForest
+#@param path The file to open
+#@param nodes (Defaults to False) If true the forest is rebuilt as nodes, otherwise it is opened lazily
+#@param arena (Defaults to None) The NodeArena used when the forest is rebuilt
+#@returns a ForestFile, or the list of root nodes when nodes is True
+def loadForest(path,nodes = False,arena = None):
+    forest=ForestFile(path)
+    if nodes:
+        return forest.toNodes(arena)
+    return forest
@@ -0,0 +1,111 @@
+###############################################################################
+##CandidateCache.py
+##Last Modified: 10-18-2026
+##
+##A persistent store of the candidates found by the generators, so words that
+##were seen in an earlier run do not have their candidates generated again
+###############################################################################
+import sqlite3,json,atexit
+from ..IndexCache import cachePath,wordNetVersion
+
+##The layout of the stored candidates. A store written with another layout is thrown away
+CANDIDATE_FORMAT="2"
+
+##Keeps the candidate synsets of each (word,part of speech,generator) in an SQLite file.
+#Candidates are stored as synset offsets, and the whole store is thrown away when the
+#WordNet version changes. New candidates are committed in batches, so the last few are
+#only on disk after flush or close. Anything still waiting is committed when the program exits,
+#and the store can be used in a with statement to close it
+class CandidateCache:
+    ##Opens (or creates) the candidate store
+    #@param path The file to keep the store in. Defaults to candidates.sqlite in the cache directory
+    #@param version The WordNet version the candidates come from. Defaults to the version nltk is reading
+    #@param commit_every (Defaults to 1000) How many words are stored between commits
+    def __init__(self,path=None,version=None,commit_every=1000):
+        if path is None:
+            path=cachePath("candidates.sqlite")
+        if version is None:
+            version=wordNetVersion()
+
+        ##The location of the store
+        self.path=path
+
+        ##The version of WordNet used to create the candidates
+        self.version=version
+
+        ##How many words are stored between commits
+        self.commit_every=commit_every
+
+        ##The number of words stored since the last commit
+        self.__pending=0
+
+        self.__connection=sqlite3.connect(path)
+        self.__connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.__connection.execute("CREATE TABLE IF NOT EXISTS candidates (word TEXT, pos TEXT, generator TEXT, offsets TEXT, PRIMARY KEY (word,pos,generator))")
+        stamp=version+"|"+CANDIDATE_FORMAT
+        row=self.__connection.execute("SELECT value FROM meta WHERE key = 'stamp'").fetchone()
+        if row is None or row[0] != stamp:
+            #Candidates from another WordNet (or stored under other generator names) are no good to us
+            self.__connection.execute("DELETE FROM candidates")
+            self.__connection.execute("DELETE FROM meta")
+            self.__connection.execute("INSERT INTO meta VALUES ('stamp',?)",(stamp,))
+        self.__connection.commit()
+        #sqlite throws away an open transaction when the program exits without a commit
+        atexit.register(self.flush)
+
+    ##Uses the store in a with statement
+    #@returns the store
+    def __enter__(self):
+        return self
+
+    ##Closes the store at the end of a with statement
+    #@returns False, so an exception is not swallowed
+    def __exit__(self,kind,value,trace):
+        self.close()
+        return False
+
+    ##Looks up the stored candidates for a word
+    #@param word The word (in WordNet format) the candidates were generated from
+    #@param pos The part of speech of the candidates
+    #@param generator The name the generator's candidates are stored under
+    #@returns a list of synset offsets, or None if the word has not been stored
+    def get(self,word,pos,generator):
+        row=self.__connection.execute("SELECT offsets FROM candidates WHERE word = ? AND pos = ? AND generator = ?",(word,pos,generator)).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    ##Stores the candidates of a word, replacing anything that was there
+    #@param word The word (in WordNet format) the candidates were generated from
+    #@param pos The part of speech of the candidates
+    #@param generator The name the generator's candidates are stored under
+    #@param offsets The list of synset offsets of the candidates
+    def put(self,word,pos,generator,offsets):
+        self.putMany([(word,pos,generator,offsets)])
+
+    ##Stores the candidates of many words at once
+    #@param entries A list of (word,pos,generator,offsets) tuples
+    def putMany(self,entries):
+        self.__connection.executemany("INSERT OR REPLACE INTO candidates VALUES (?,?,?,?)",
+                                      [(word,pos,generator,json.dumps(list(offsets))) for (word,pos,generator,offsets) in entries])
+        self.__pending+=len(entries)
+        if self.__pending >= self.commit_every:
+            self.flush()
+
+    ##Commits the candidates stored since the last commit. Does nothing once the store is closed
+    def flush(self):
+        if self.__connection is not None:
+            self.__connection.commit()
+        self.__pending=0
+
+    ##Removes every stored candidate
+    def clear(self):
+        self.__connection.execute("DELETE FROM candidates")
+        self.flush()
+
+    ##Commits anything still waiting and closes the underlying file
+    def close(self):
+        if self.__connection is not None:
+            self.flush()
+            self.__connection.close()
+            self.__connection=None
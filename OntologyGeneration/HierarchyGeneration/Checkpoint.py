@@ -0,0 +1,165 @@
+###############################################################################
+##Checkpoint.py
+##Last Modified: 10-18-2026
+##
+##Saves the state of a SynsetResolver between sieve stages so a long
+##resolution can be picked up where it stopped. The candidates of every word
+##are kept as synset names, their heuristic scores as a word x candidate x
+##heuristic array (padded with nan), and the answers as positions in each
+##word's candidate list
+###############################################################################
+import hashlib
+import numpy as np
+from nltk.corpus import wordnet as wn
+from ..IndexCache import saveArrays,loadArrays
+
+##answer_state values for the answer of a word
+UNRESOLVED=0
+NO_ANSWER=1
+SINGLE_ANSWER=2
+LIST_ANSWER=3
+
+##Makes sure a checkpoint path ends in .npz (numpy adds it otherwise)
+def checkpointPath(path):
+    if path.endswith(".npz"):
+        return path
+    return path+".npz"
+
+##Turns a word or keyword into a byte string for hashing (synsets are given by name)
+def packText(text):
+    if not isinstance(text,basestring):
+        text=text.name()
+    return text.encode("utf-8") if isinstance(text,unicode) else text
+
+##Describes a resolution so a checkpoint is only used to resume the same one
+#@param word_list The ordered words being resolved
+#@param method The resolver method (i.e. "multi-sieve")
+#@param methods The list of (method,type) stages
+#@param extra Anything else that changes the results (i.e. alpha and multi_parent)
+#@param keywords (Defaults to None) The dictionary of word=>keywords the candidates are scored against
+#@param generator (Defaults to None) The generator the candidates were made with
+#@returns the stamp string
+def checkpointStamp(word_list,method,methods,extra = "",keywords = None,generator = None):
+    words=hashlib.md5("\n".join(packText(word) for word in word_list)).hexdigest()
+    found=hashlib.md5()
+    if keywords is not None:
+        for word in word_list:
+            found.update(packText(word)+"\t"+"\t".join(sorted(packText(key) for key in (keywords.get(word) or [])))+"\n")
+    stages=",".join(getattr(m[0],"__name__",str(m[0]))+":"+m[1] for m in methods)
+    source=getattr(generator,"__name__",type(generator).__name__)
+    return "|".join([words,found.hexdigest(),source,method,stages,str(extra)])
+
+##Packs candidate score vectors into a padded array
+#@param word_list The ordered words
+#@param all_synsets The dictionary of word=>candidate nodes
+#@returns a dictionary of the candidate and score arrays
+def packScores(word_list,all_synsets):
+    counts=[len(all_synsets.get(word,[])) for word in word_list]
+    width=max([len(node.getScore()) for word in word_list for node in all_synsets.get(word,[])] or [0])
+    scores=np.empty((len(word_list),max(counts or [0]),width),dtype=np.float64)
+    scores.fill(np.nan)
+    lengths=np.zeros((len(word_list),max(counts or [0])),dtype=np.int32)
+    missing=np.zeros(scores.shape,dtype=bool)
+    names=[]
+    for i,word in enumerate(word_list):
+        for j,node in enumerate(all_synsets.get(word,[])):
+            synset=node.getSynSet()
+            names.append(synset if isinstance(synset,basestring) else synset.name())
+            vector=node.getScore()
+            lengths[i,j]=len(vector)
+            for k,score in enumerate(vector):
+                if score is None:
+                    missing[i,j,k]=True
+                else:
+                    scores[i,j,k]=score
+    indptr=np.zeros(len(word_list)+1,dtype=np.int64)
+    indptr[1:]=np.cumsum(counts)
+    return {"candidate_indptr":indptr,
+            "candidate_names":np.array(names,dtype=unicode),
+            "scores":scores,
+            "score_lengths":lengths,
+            "score_missing":missing}
+
+##Packs the answers of a resolver as positions in each word's candidate list
+#@param word_list The ordered words
+#@param all_synsets The dictionary of word=>candidate nodes
+#@param answers The dictionary of word=>answer (None, False, a node or a list of nodes)
+#@returns a dictionary of the answer arrays
+def packAnswers(word_list,all_synsets,answers):
+    states=np.zeros(len(word_list),dtype=np.int8)
+    indptr=[0]
+    indices=[]
+    for i,word in enumerate(word_list):
+        answer=answers.get(word)
+        if answer is False:
+            states[i]=NO_ANSWER
+        elif answer is not None:
+            states[i]=LIST_ANSWER if isinstance(answer,list) else SINGLE_ANSWER
+            positions=dict((node.identity(),j) for j,node in enumerate(all_synsets[word]))
+            for node in (answer if isinstance(answer,list) else [answer]):
+                indices.append(positions[node.identity()])
+        indptr.append(len(indices))
+    return {"answer_state":states,
+            "answer_indptr":np.array(indptr,dtype=np.int64),
+            "answer_indices":np.array(indices,dtype=np.int32)}
+
+##Saves the state of a resolution after a stage
+#@param path The .npz file to write
+#@param stamp The stamp from checkpointStamp
+#@param stage The number of stages that are finished (0 means only the candidates were generated)
+#@param word_list The ordered words
+#@param all_synsets The dictionary of word=>candidate nodes
+#@param answers The dictionary of word=>answer
+def saveCheckpoint(path,stamp,stage,word_list,all_synsets,answers):
+    path=checkpointPath(path)
+    arrays=packScores(word_list,all_synsets)
+    arrays.update(packAnswers(word_list,all_synsets,answers))
+    arrays["stage"]=np.array(stage,dtype=np.int64)
+    saveArrays(path,stamp,**arrays)
+
+##Turns a saved name back into a synset (names that are not synsets are words)
+def unpackName(name):
+    name=name.encode("utf-8") if isinstance(name,unicode) else name
+    try:
+        return wn.synset(name)
+    except Exception:
+        return name
+
+##Loads a checkpoint saved by saveCheckpoint
+#@param path The .npz file
+#@param stamp The stamp the checkpoint must have been saved with
+#@param word_list The ordered words
+#@param createNode A function that makes a node from a synset
+#@returns a tuple of (stage,all_synsets,answers), or None if there is no matching checkpoint
+def loadCheckpoint(path,stamp,word_list,createNode):
+    arrays=loadArrays(checkpointPath(path),stamp)
+    if arrays is None:
+        return None
+    indptr=arrays["candidate_indptr"]
+    names=arrays["candidate_names"]
+    scores=arrays["scores"]
+    lengths=arrays["score_lengths"]
+    missing=arrays["score_missing"]
+    all_synsets={}
+    for i,word in enumerate(word_list):
+        nodes=[]
+        for j in range(int(indptr[i+1]-indptr[i])):
+            node=createNode(unpackName(names[indptr[i]+j]))
+            node.setScore([None if missing[i,j,k] else float(scores[i,j,k]) for k in range(lengths[i,j])])
+            nodes.append(node)
+        all_synsets[word]=nodes
+    answers={}
+    states=arrays["answer_state"]
+    answer_indptr=arrays["answer_indptr"]
+    answer_indices=arrays["answer_indices"]
+    for i,word in enumerate(word_list):
+        chosen=[all_synsets[word][j] for j in answer_indices[answer_indptr[i]:answer_indptr[i+1]]]
+        if states[i] == UNRESOLVED:
+            answers[word]=None
+        elif states[i] == NO_ANSWER:
+            answers[word]=False
+        elif states[i] == SINGLE_ANSWER:
+            answers[word]=chosen[0]
+        else:
+            answers[word]=chosen
+    return (int(arrays["stage"]),all_synsets,answers)
@@ -0,0 +1,117 @@
+###############################################################################
+##EmbeddingIndex.py
+##Last Modified: 10-18-2026
+##
+##Nearest word lookups over a word-vector model for buildForestWordVectors.
+##The vectors are pulled out of the model once into a matrix. A cluster
+##centroid is the mean of its members' unit vectors, and its nearest word is
+##found by cosine similarity against the unit vectors of the whole vocabulary,
+##leaving out the members themselves (the same answer as gensim's
+##most_similar(positive=members,topn=1)). Any object with the same lookup and
+##nearest methods can be used instead, such as an approximate index for very
+##large vocabularies
+###############################################################################
+import numpy as np
+
+##An exact cosine nearest neighbour index over every word of a model
+class ExactCosineIndex:
+    ##Creates the index
+    #@param words The vocabulary, in the order of the rows of matrix
+    #@param matrix The word vectors, one row per word
+    #@param chunk_size (Defaults to 1<<24) The largest number of similarities (or vector values) worked on at once
+    #@param normalized (Defaults to None) The unit length word vectors, if the model already has them. Otherwise they
+    #are made here, a block of rows at a time, so the only copy of the matrix is the normalized one
+    def __init__(self,words,matrix,chunk_size = 1<<24,normalized = None):
+        ##The vocabulary
+        self.words=list(words)
+
+        ##word=>row
+        self.positions=dict((word,i) for i,word in enumerate(self.words))
+
+        ##The word vectors as given by the model
+        self.vectors=np.asarray(matrix)
+
+        ##The upper bound on the size of the similarity blocks
+        self.chunk_size=chunk_size
+
+        if normalized is None:
+            normalized=np.empty(self.vectors.shape,dtype=self.vectors.dtype)
+            step=max(1,chunk_size//max(1,self.vectors.shape[1]))
+            for start in range(0,len(self.vectors),step):
+                block=self.vectors[start:start+step]
+                norms=np.sqrt(np.einsum("ij,ij->i",block,block))
+                norms[norms == 0]=1.0
+                np.divide(block,norms[:,np.newaxis],out=normalized[start:start+step])
+        ##The unit length word vectors
+        self.normalized=np.asarray(normalized)
+
+    ##Creates an index from a gensim model (or its KeyedVectors)
+    #@param model The word-vector model
+    #@returns an ExactCosineIndex over the whole vocabulary of the model
+    @staticmethod
+    def fromModel(model):
+        vectors=getattr(model,"wv",model)
+        if hasattr(vectors,"vectors"):
+            matrix=vectors.vectors
+        else:
+            matrix=vectors.syn0
+        #The unit vectors gensim keeps for most_similar, so they are not made a second time
+        normalized=getattr(vectors,"vectors_norm",None)
+        if normalized is None:
+            normalized=getattr(vectors,"syn0norm",None)
+        return ExactCosineIndex(vectors.index2word,matrix,normalized=normalized)
+
+    def __contains__(self,word):
+        return word in self.positions
+
+    def __len__(self):
+        return len(self.words)
+
+    ##Gets the vectors of a group of words
+    #@param words A list of words in the vocabulary
+    #@returns a len(words) x dimensions matrix
+    def lookup(self,words):
+        return self.vectors[[self.positions[word] for word in words]]
+
+    ##Computes the centroid of each group of words as the mean of their unit vectors
+    #@param words A list of words in the vocabulary
+    #@param labels The group of each word
+    #@param groups The groups to make centroids for
+    #@returns a len(groups) x dimensions matrix
+    def centroids(self,words,labels,groups):
+        rows=np.array([self.positions[word] for word in words],dtype=np.int64)
+        labels=np.asarray(labels)
+        members=(labels[np.newaxis,:] == np.asarray(groups)[:,np.newaxis]).astype(np.float64)
+        members/=np.maximum(members.sum(axis=1),1.0)[:,np.newaxis]
+        return members.dot(self.normalized[rows].astype(np.float64))
+
+    ##Finds the word most similar to each centroid
+    #@param centroids A matrix with a centroid on each row
+    #@param exclude A list with the words each centroid may not give (its members)
+    #@returns a list with the nearest word of each centroid (None if every word is excluded)
+    def nearest(self,centroids,exclude):
+        centroids=np.asarray(centroids,dtype=self.normalized.dtype)
+        step=max(1,self.chunk_size//max(1,len(self.words)))
+        found=[]
+        for start in range(0,len(centroids),step):
+            block=centroids[start:start+step].dot(self.normalized.T)
+            for row,skipped in zip(block,exclude[start:start+step]):
+                for word in skipped:
+                    if word in self.positions:
+                        row[self.positions[word]]=-np.inf
+                best=int(np.argmax(row))
+                found.append(None if row[best] == -np.inf else self.words[best])
+        return found
+
+##The indexes that have been made, by model
+model_indexes={}
+
+##Gets the shared index of a model, creating it the first time
+#@param model The word-vector model (or its KeyedVectors)
+#@returns the ExactCosineIndex of the model
+def modelIndex(model):
+    found=model_indexes.get(id(model))
+    if found is None or found[0] is not model:
+        found=(model,ExactCosineIndex.fromModel(model))
+        model_indexes[id(model)]=found
+    return found[1]
@@ -0,0 +1,93 @@
+###############################################################################
+##ForestBuilder.py
+##Last Modified: 10-18-2026
+##
+##Builds the WordNet forest of a SynsetResolver's answers. Each answer is
+##put in by walking up its primary hypernyms until a synset that already has a
+##node is reached, so there is only ever one node for a synset and each
+##ancestor is looked at once. The forest is the same one the old
+##hypernym_paths()[0] and swap loop made, down to the order of the children
+##and roots. The nodes are found through a WordNetForest, which keeps indexing
+##them as the forest is changed afterwards
+###############################################################################
+from ..DataStructures import WordNetForest
+from WordNetIndexes import hypernymParentIndex
+
+##Builds a forest out of the answers of a resolver
+#@param answers The dictionary of word=>answer node (or list of answer nodes). Words that are None or False are left out
+#@param multi_parent If true, words with more than one answer get all of them as parents
+#@param createNode A function that makes a new node from a word
+#@param parents (Defaults to the shared HypernymParentIndex) Gives the primary hypernym of a synset
+#@param forest (Defaults to a new WordNetForest) The forest the nodes are indexed in. The ancestors are made by it, so
+#its arena should be the one createNode makes nodes in
+#@returns a list of the roots, with the answers that are roots first and then the ancestors in the order they were made
+def buildHypernymForest(answers,multi_parent,createNode,parents = None,forest = None):
+    if parents is None:
+        parents=hypernymParentIndex()
+    if forest is None:
+        forest=WordNetForest()
+    answered=[word for word in answers if answers[word] is not None and answers[word] is not False]
+
+    #The last answer node given for a synset is the one used
+    answer_nodes={}
+    for word in answered:
+        if isinstance(answers[word],list):
+            for ans in answers[word]:
+                answer_nodes[str(ans.getSynSet())]=ans
+        else:
+            answer_nodes[str(answers[word].getSynSet())]=answers[word]
+    for node in answer_nodes.values():
+        forest.add(node)
+    answer_keys=set(answer_nodes)
+    roots=[node for node in answer_nodes.values() if parents.parent(node.getSynSet()) is None]
+
+    #The answers whose ancestors have been put in
+    walked=set()
+    #(parent,child) links that the old builder made by moving children off duplicate nodes.
+    #They go after all other children, in the order their paths were walked
+    moved=[]
+    for word in answered:
+        wnn=createNode(word)
+        if isinstance(answers[word],list):
+            found=answers[word]
+        else:
+            found=[answers[word]]
+        for ans in found:
+            key=str(ans.getSynSet())
+            hyp=forest.find(key)
+            hyp.attachChild(wnn,True,multi_parent)
+            if key in walked:
+                continue
+            walked.add(key)
+            #The node below the current synset on the path, or None if the old builder would have made a duplicate for it
+            child=hyp
+            path=set([key])
+            synset=parents.parent(hyp.getSynSet())
+            while synset is not None and str(synset) not in path:
+                key=str(synset)
+                path.add(key)
+                above=parents.parent(synset)
+                (node,made)=forest.node(synset)
+                if not made:
+                    if child is not None:
+                        moved.append((node,child))
+                    if key not in answer_keys or key in walked:
+                        #Everything above this synset is already in the forest
+                        break
+                    #An answer whose ancestors are not in yet, so the path carries on above it
+                    child=None
+                else:
+                    if child is not None:
+                        node.attachChild(child)
+                    if above is None or str(above) in path:
+                        roots.append(node)
+                    child=node
+                synset=above
+
+    for (parent,child) in moved:
+        parent.attachChild(child,False)
+        if multi_parent:
+            child.attachToParent([parent])
+        else:
+            child.attachToParent(parent)
+    return roots
@@ -8,32 +8,75 @@
 from nltk.corpus import wordnet as wn
 from ..CommonFunctions import compoundWord,transformToWordNetFormat,removeAllEndNumbers
 from ..DataStructures import WordNetNode
+from WordNetIndexes import agentiveVerbIndex,descendantIndex
+
+##The ancestor every candidate of generatePhysicalSynsets must have (or be)
+PHYSICAL_ROOT="physical_entity.n.01"
+
+##The persistent candidate store the generators read through. None means candidates are always generated
+candidate_cache=None
+
+##Sets the persistent candidate store used by the generators. Anything waiting in the old store is committed
+#@param cache A CandidateCache, or None to stop caching candidates
+def setCandidateCache(cache):
+        global candidate_cache
+        if candidate_cache is not None:
+                candidate_cache.flush()
+        candidate_cache=cache
+
+##Commits the candidates waiting in the candidate store (if there is one), so they are kept for the next run
+def flushCandidateCache():
+        if candidate_cache is not None:
+                candidate_cache.flush()
+
+##Gets the name the candidates of a generator are stored under. The filter is part of the name, so candidates
+#kept by one filter (an agent keyword or a noun root) are never read back for another
+#@param generator The name of the generator
+#@param setting What the candidates are filtered on
+#@returns the name to use in the candidate store
+def storeName(generator,setting):
+        return generator+":"+setting
+
+##Looks up the candidates of a word in the candidate store
+#@param word The word to find the candidates of
+#@param pos The part of speech of the candidates
+#@param generator The name the generator's candidates are stored under
+#@returns a list of fresh WordNetNodes, or None if the word has not been stored
+def readCandidateCache(word,pos,generator):
+        if candidate_cache is None:
+                return None
+        offsets=candidate_cache.get(word,pos,generator)
+        if offsets is None:
+                return None
+        return [WordNetNode(wn.synset_from_pos_and_offset(pos,offset)) for offset in offsets]
+
+##Writes the candidates of a word into the candidate store (if there is one)
+#@param word The word the candidates were generated from
+#@param pos The part of speech of the candidates
+#@param generator The name the generator's candidates are stored under
+#@param nodes The generated candidates as WordNetNodes
+def writeCandidateCache(word,pos,generator,nodes):
+        if candidate_cache is not None:
+                candidate_cache.put(word,pos,generator,[node.getSynSet().offset() for node in nodes])
+
 ##Filters out a list of verbs that are not active verbs
 #@param synsets The list of candidate synsets
 #@returns a list of filtered synsets that only contain active verbs
 def removeVerbSynsets(synsets):
-        keyword="Somebody"
-        new_sets=[]
-        for syn in synsets:
-            found=False
-            for lemma in syn.lemmas():
-                for s in lemma.frame_strings():
-                    if keyword in s:
-                        #We also should add a framenet connection check.
-                        #It doesn't make sense to deal with senses that
-                        #have no check
-                        found=True
-            if found:
-                new_sets.append(WordNetNode(syn))
-        #print "Removed",str(len(synsets)-len(new_sets)),"from search"
-        return new_sets
+        #The frames are checked once for every verb when the index is built.
+        #We also should add a framenet connection check.
+        #It doesn't make sense to deal with senses that
+        #have no check
+        agentive=agentiveVerbIndex()
+        return [WordNetNode(syn) for syn in synsets if syn in agentive]
 
 ##Filters out a list of nouns that are not physical object children
 #@param synsets The list of candidate synsets
+#@param root The name of the ancestor every kept noun must have (or be)
 #@returns a list of filtered synsets that only contain nouns with a physical object ancestor
-def removeNounSynsets(synsets):
-        physical=wn.synset("physical_entity.n.01")
-        return [WordNetNode(item) for item in synsets if physical.lowest_common_hypernyms(item)[0] == physical]
+def removeNounSynsets(synsets,root=PHYSICAL_ROOT):
+        descendants=descendantIndex(root)
+        return [WordNetNode(item) for item in synsets if item in descendants]
         
 
 ##We create an ordering precedence for finding synsets.
@@ -43,6 +86,10 @@ def removeNounSynsets(synsets):
 #@param word The word to have candidates generated from
 #@returns A list of all candidate active tense verbs
 def generateVerbSynsets(word):
+        name=storeName("generateVerbSynsets",agentiveVerbIndex().keyword)
+        cached=readCandidateCache(word,wn.VERB,name)
+        if cached is not None:
+                return cached
         syn=wn.synsets(word,pos=wn.VERB)
         #if len(syn) == 0:
         words=compoundWord(word)
@@ -54,7 +101,9 @@ def generateVerbSynsets(word):
         syn = list(set(syn))
         #Finally, remove all the synsets that can't be
         #agent actions
-        return list(set(removeVerbSynsets(syn)))
+        nodes=list(set(removeVerbSynsets(syn)))
+        writeCandidateCache(word,wn.VERB,name,nodes)
+        return nodes
 
 ##Generates noun synsets using the following precidence
 #1)the broken up camel case
@@ -63,6 +112,10 @@ def generateVerbSynsets(word):
 #@param word The word to have candidates generated from
 #@returns A list of all candidate active tense verbs
 def generatePhysicalSynsets(word):
+        name=storeName("generatePhysicalSynsets",PHYSICAL_ROOT)
+        cached=readCandidateCache(word,wn.NOUN,name)
+        if cached is not None:
+                return cached
         syn=wn.synsets(word,pos=wn.NOUN)
         #if len(syn) == 0:
         words=compoundWord(word)
@@ -74,7 +127,63 @@ def generatePhysicalSynsets(word):
         syn = list(set(syn))
         #Finally, remove all the synsets that can't be
         #agent actions
-        return list(set(removeNounSynsets(syn)))
+        nodes=list(set(removeNounSynsets(syn,PHYSICAL_ROOT)))
+        writeCandidateCache(word,wn.NOUN,name,nodes)
+        return nodes
+
+##Generates candidates for a whole vocabulary at once. Each distinct lookup (compound word or fragment)
+#is sent to WordNet once, and each distinct synset is filtered once, no matter how many words share them
+#@param words The dictionary made by parseList (or any iterable of words in WordNet format)
+#@param pos The part of speech of the candidates
+#@param generator The name the candidates are stored under (as made by storeName for the single word generator)
+#@param keep The synsets that pass the filter (anything supporting "in")
+#@returns a dictionary of word=>list of fresh WordNetNodes
+def generateSynsetsBatch(words,pos,generator,keep):
+        all_candidates={}
+        word_keys={}
+        for word in words:
+                cached=readCandidateCache(word,pos,generator)
+                if cached is not None:
+                        all_candidates[word]=cached
+                else:
+                        #Same lookups as the single word generators, the compound word then each fragment
+                        word_keys[word]=[compoundWord(word)]+word.split('_')
+        lookups={}
+        for keys in word_keys.itervalues():
+                for key in keys:
+                        if key not in lookups:
+                                lookups[key]=wn.synsets(key,pos=pos)
+        word_synsets={}
+        distinct=set()
+        for word in word_keys:
+                word_synsets[word]=set(syn for key in word_keys[word] for syn in lookups[key])
+                distinct|=word_synsets[word]
+        kept=set(syn for syn in distinct if syn in keep)
+        new_entries=[]
+        for word in word_synsets:
+                all_candidates[word]=[WordNetNode(syn) for syn in word_synsets[word] if syn in kept]
+                new_entries.append((word,pos,generator,[node.getSynSet().offset() for node in all_candidates[word]]))
+        if candidate_cache is not None and len(new_entries) > 0:
+                candidate_cache.putMany(new_entries)
+                candidate_cache.flush()
+        return all_candidates
+
+##The batch form of generateVerbSynsets
+#@param words The dictionary made by parseList (or any iterable of words in WordNet format)
+#@returns a dictionary of word=>list of candidate active tense verbs
+def generateVerbSynsetsBatch(words):
+        agentive=agentiveVerbIndex()
+        return generateSynsetsBatch(words,wn.VERB,storeName("generateVerbSynsets",agentive.keyword),agentive)
+
+##The batch form of generatePhysicalSynsets
+#@param words The dictionary made by parseList (or any iterable of words in WordNet format)
+#@returns a dictionary of word=>list of candidate physical objects
+def generatePhysicalSynsetsBatch(words):
+        return generateSynsetsBatch(words,wn.NOUN,storeName("generatePhysicalSynsets",PHYSICAL_ROOT),descendantIndex(PHYSICAL_ROOT))
+
+#SynsetResolver uses the batch form of a generator when it has one
+generateVerbSynsets.batch=generateVerbSynsetsBatch
+generatePhysicalSynsets.batch=generatePhysicalSynsetsBatch
 
 ##Converts the word into a lower_case format and sets that as the only candidate. Splits the word if possible
 #@param word The word to have candidates generated from
@@ -10,16 +10,46 @@
 from nltk.corpus import stopwords
 from nltk.stem.snowball import SnowballStemmer
 from ..CommonFunctions import printStats,transformToSpaceFormat,transformToPARFormat
-from ..DataStructures import WordNetNode
+from ..DataStructures import WordNetNode,WordNetForest
+from ParallelResolve import createPool,scoreIndependent
+from ForestBuilder import buildHypernymForest
+from EmbeddingIndex import modelIndex
+from Generators import flushCandidateCache
+from Checkpoint import checkpointStamp,saveCheckpoint,loadCheckpoint,packScores
 import numpy as np
 from random import shuffle
 #import matplotlib.pyplot as plt
 
 ##Creates a WordNetNode out of a list of words as strings
 #@param list_of_strings A list of strings to be turned into WNN
+#@param arena (Defaults to None) The NodeArena to create the nodes in. None creates WordNetNode objects
 #@returns a list of WNN based off the strings
-def createWNNs(list_of_strings):
+def createWNNs(list_of_strings,arena = None):
+    if arena is not None:
+        return [arena.node(i) for i in list_of_strings]
     return [WordNetNode(i) for i in list_of_strings]
+
+##Finds the position of the highest value in each segment of an array. The first of several equal values wins,
+#and nan never wins unless it starts the segment (since nothing compares greater than it)
+#@param values A 1-D array holding the segments one after another
+#@param counts The length of each segment
+#@returns an array with the position of the highest value inside each segment, or -1 for an empty segment
+def segmentArgmax(values,counts):
+    values=np.asarray(values,dtype=np.float64)
+    counts=np.asarray(counts,dtype=np.int64)
+    best=np.empty(len(counts),dtype=np.int64)
+    best.fill(-1)
+    filled=counts > 0
+    if not filled.any():
+        return best
+    starts=(np.cumsum(counts)-counts)[filled]
+    ranked=np.where(np.isnan(values),-np.inf,values)
+    highest=np.repeat(np.maximum.reduceat(ranked,starts),counts[filled])
+    positions=np.where(ranked == highest,np.arange(len(values)),len(values))
+    first=np.minimum.reduceat(positions,starts)-starts
+    first[np.isnan(values[starts])]=0
+    best[filled]=first
+    return best
         
             
 ##Disambiguates synsets based on the word and a set of keywords. This is a general class that will disambiguate and create a wordnet
@@ -29,7 +59,10 @@ class SynsetResolver:
     #@param words A dictionary of the form "word"=>"list of keywords"
     #@param correct_answers (Defaults to None) When using the system for testing, this holds a dictionary of the form "word"=>synset, where "word" should match up to the a word in @param word
     #@param alpha (Defaults to 0.3) The threshold for deciding if a synset is viable
-    def __init__(self,words=None,correct_answers=None,method = "choice", hand_cluster = True, multi_parent = None, alpha=0.3,scores=None,no_prune = False):
+    #@param processes (Defaults to None) The number of worker processes used for independent methods. None runs them in this process
+    #@param arena (Defaults to None) A NodeArena that holds the candidates and the generated forests instead of WordNetNode objects
+    #@param checkpoint (Defaults to None) The .npz file the candidates, scores and answers are saved to after each stage. None saves nothing
+    def __init__(self,words=None,correct_answers=None,method = "choice", hand_cluster = True, multi_parent = None, alpha=0.3,scores=None,no_prune = False,processes = None,arena = None,checkpoint = None):
         ##The list of words and keywords
         self.unresolved=words
 
@@ -69,6 +102,32 @@ class SynsetResolver:
 
         ##If set to true, does not prune the candidates, but leaves them in tact
         self.__no_prune = no_prune
+
+        ##The number of worker processes for independent methods (None or 1 keeps everything in this process)
+        self.processes = processes
+
+        ##The pool of workers, which only exists while synsets are being resolved
+        self.__pool = None
+
+        ##The store for all nodes made by the resolver (None makes WordNetNode objects)
+        self.arena = arena
+
+        ##The synset=>node index of the last forest built by buildWordNetForest
+        self.forest = None
+
+        ##The file the state is saved to after each stage, so resolveSynsets can resume from it
+        self.checkpoint = checkpoint
+
+        ##Describes the current resolution, so only a matching checkpoint is resumed
+        self.__stamp = None
+
+    ##Creates a node for a synset (or word), in the arena if there is one
+    #@param synset The synset or string the node holds
+    #@returns a WordNetNode (or an ArenaNode)
+    def createNode(self,synset):
+        if self.arena is not None:
+            return self.arena.node(synset)
+        return WordNetNode(synset)
     ##If a word cannot be resolved into a synset, then a simulation author must resolve the synset by hand
     #@param word The synset word that needs to be resolved
     #@param synsets All the candidate synsets
@@ -113,18 +172,46 @@ class SynsetResolver:
     ##Using the list of wordss and their associated keywords, this method generates and resolves synsets to all words. If a word cannot be
     #resolved, then the system returns None
     #@param generator A pointer to the generator function that uses the list of words as input
-    #@param methods A list of methods that are used to resolve synsets. These methods are written as (method,type) where type is either independent or dependent. Independent methods take a single word, their keywords, and their associated synsets, and (dependent, dependent_repeat) methods take the dictionary of words,keywords, and their associated synsets
-    def resolveSynsets(self,generator,methods):
+    #@param methods A list of methods that are used to resolve synsets. These methods are written as (method,type) where type is either independent or dependent. Independent methods take a single word, their keywords, and their associated synsets, and (dependent, dependent-repeat, dependent-delta) methods take the dictionary of words,keywords, and their associated synsets
+    #@param resume (Defaults to False) If true and the checkpoint file holds the same resolution, starts after the last stage it finished
+    def resolveSynsets(self,generator,methods,resume = False):
         self.answers={}#Clean out the generated answers
         all_synsets={}
         for word in self.word_list:
             self.answers[word]=None#If the word is unresolved, then it is set to none
-            if generator is not None: #Generate the synsets if we have a method
-                all_synsets[word]=generator(word)
-        if self.method == "multi-sieve":
-            self.__multiSeiveResolve(all_synsets,methods)
-        elif self.method == "cluster-prob":
-            self.__probabilityCluster(all_synsets,methods)
+        start = 0
+        restored = None
+        if self.checkpoint is not None:
+            alpha = self.alpha if isinstance(self.alpha,(int,float)) else type(self.alpha).__name__
+            self.__stamp = checkpointStamp(self.word_list,self.method,methods,(alpha,self.multi_parent,self.__no_prune,self.hand_cluster),self.unresolved,generator)
+            if resume:
+                restored = loadCheckpoint(self.checkpoint,self.__stamp,self.word_list,self.createNode)
+        if restored is not None: #The candidates, scores and answers of the finished stages
+            (start,all_synsets,self.answers) = restored
+        elif generator is not None: #Generate the synsets if we have a method
+            if hasattr(generator,"batch"): #The whole vocabulary at once, which shares lookups between words
+                all_synsets=generator.batch(self.word_list)
+            else:
+                for word in self.word_list:
+                    all_synsets[word]=generator(word)
+            flushCandidateCache()
+            if self.arena is not None: #The generators make WordNetNodes, which are moved into the arena
+                for word in all_synsets:
+                    all_synsets[word]=[self.arena.adopt(node) for node in all_synsets[word]]
+            self.__saveCheckpoint(0,all_synsets)
+        if self.method == "multi-sieve" or self.method == "cluster-prob":
+            if self.processes is not None and self.processes > 1: #Independent methods are spread over a pool of workers
+                self.__pool = createPool(self.processes)
+            try:
+                if self.method == "multi-sieve":
+                    self.__multiSeiveResolve(all_synsets,methods,start)
+                else:
+                    self.__probabilityCluster(all_synsets,methods,start)
+            finally:
+                if self.__pool is not None:
+                    self.__pool.close()
+                    self.__pool.join()
+                    self.__pool = None
         else:
             for word in all_synsets: #This doesn't resolve polysem words, but assumes we already have it
                 if self.multi_parent: #If we have multiple parents, then we can have all of them
@@ -142,15 +229,22 @@ class SynsetResolver:
     ##Performs a multi-sieve technique to resolve synsets. Multi-sieve methods are hierarchical in nature, in that once a synset passes the threshold, it is considered a good candidate
     #@param all_synsets A dictionary that holds all candidate synsets
     #@param methods The methods to apply to the synset candidates
+    #@param start (Defaults to 0) The first stage to run, when resuming from a checkpoint
     #@returns Nothing, because the final result is stored in self
-    def __multiSeiveResolve(self,all_synsets,methods):
-        for method in methods:
+    def __multiSeiveResolve(self,all_synsets,methods,start = 0):
+        for stage in range(start,len(methods)):
+            method = methods[stage]
             #print method[1]
             if method[1] == "independent":
-                for word in self.word_list:
-                    if self.answers[word] is None:
-                        #ret_val returns a tuple of (highest synset, alpha value)
-                        ret_val=method[0](word,self.unresolved[word],all_synsets[word],True)
+                if self.__pool is not None:
+                    scoreIndependent(self.__pool,self.processes,method[0],[word for word in self.word_list if self.answers[word] is None],self.unresolved,all_synsets,True)
+                elif hasattr(method[0],"batch"): #Scores the whole vocabulary at once
+                    method[0].batch([word for word in self.word_list if self.answers[word] is None],self.unresolved,all_synsets,True)
+                else:
+                    for word in self.word_list:
+                        if self.answers[word] is None:
+                            #ret_val returns a tuple of (highest synset, alpha value)
+                            ret_val=method[0](word,self.unresolved[word],all_synsets[word],True)
             elif method[1] == "dependent":
                 #Dependent one off
                 all_syns=sorted({x for v in all_synsets.itervalues() for x in v})
@@ -161,29 +255,62 @@ class SynsetResolver:
             elif method[1] == "dependent-repeat":
                 #Dependent repeat until changed
                 changed = True
+                #The keywords never change between rounds
+                all_keys=sorted({x for v in self.unresolved.itervalues() for x in v})
                 while changed:
-                    all_syns=sorted({x for v in all_synsets.itervalues() for x in v})
-                    all_keys=sorted({x for v in self.unresolved.itervalues() for x in v})
-                    if not self.multi_parent:
-                        found_candidates = [self.answers[i] for i in self.answers if self.answers[i] is not None and self.answers[i] is not False]
-                    else:
-                        found_candidates = []
-                        for i in self.answers:
-                            if isinstance(self.answers[i],list):
-                                found_candidates.extend(self.answers[i])
-                            elif isinstance(self.answers[i],WordNetNode):
-                                found_candidates.append(self.answers[i])
+                    found_candidates = self.__resolvedCandidates(self.answers)
                     found_keywords = [i for i in all_keys if i not in self.unresolved[word]]
                     for word in self.word_list:
                         if self.answers[word] is None:
                             method[0](all_synsets[word],found_candidates,self.unresolved[word],found_keywords,True)
                     changed = self.__pruneMultiSieve(all_synsets)
                     #print changed
+            elif method[1] == "dependent-delta":
+                #Dependent repeat for methods that keep the highest score (pathResolve). Resolved answers never change,
+                #so each round only scores against the candidates resolved in the round before
+                resolved = set(word for word in self.word_list if self.answers[word] is not None)
+                new_words = [word for word in self.word_list if word in resolved]
+                found_keywords = set()
+                changed = True
+                while changed:
+                    new_candidates = self.__resolvedCandidates(new_words)
+                    for word in new_words:
+                        if self.unresolved[word] is not None:
+                            found_keywords |= self.unresolved[word]
+                    if len(new_candidates) > 0:
+                        for word in self.word_list:
+                            if self.answers[word] is None:
+                                method[0](all_synsets[word],new_candidates,self.unresolved[word],found_keywords,True)
+                    changed = self.__pruneMultiSieve(all_synsets)
+                    new_words = [word for word in self.word_list if word not in resolved and self.answers[word] is not None]
+                    resolved.update(new_words)
             self.__pruneMultiSieve(all_synsets) #We do this at each iteration. For dependent-repeat, the iteration after change should have no effect, so it is fine to run once
+            self.__saveCheckpoint(stage+1,all_synsets)
         if self.__no_prune:
             self.answers = all_synsets
 
             
+    ##Saves the candidates, their scores and the answers so far, if the resolver has a checkpoint file
+    #@param stage The number of stages that are finished
+    #@param all_synsets A dictionary that holds all candidate synsets
+    def __saveCheckpoint(self,stage,all_synsets):
+        if self.checkpoint is not None:
+            saveCheckpoint(self.checkpoint,self.__stamp,stage,self.word_list,all_synsets,self.answers)
+
+    ##Gathers the resolved candidates of a group of words
+    #@param words The words to gather the answers of
+    #@returns a list of the WordNetNodes chosen for those words
+    def __resolvedCandidates(self,words):
+        if not self.multi_parent:
+            return [self.answers[i] for i in words if self.answers[i] is not None and self.answers[i] is not False]
+        found_candidates = []
+        for i in words:
+            if isinstance(self.answers[i],list):
+                found_candidates.extend(self.answers[i])
+            elif isinstance(self.answers[i],WordNetNode):
+                found_candidates.append(self.answers[i])
+        return found_candidates
+
     ##Examines the candidates and sets a synset if the synset is higher than alpha
     #@param all_synsets The set of candidate synsets. Each candidate is a WordNetNode
     #@returns Nothing because the work is done to self.answers
@@ -228,14 +355,21 @@ class SynsetResolver:
     ##Performs an end clustering technique using the scores from all methods to provide a probability score
     #@param all_synsets A dictionary that holds all candidate synsets
     #@param methods The methods to apply to the synset candidates
+    #@param start (Defaults to 0) The first stage to run, when resuming from a checkpoint
     #@returns Nothing, because the final result is stored in self
-    def __probabilityCluster(self,all_synsets,methods):
-        for method in methods:
+    def __probabilityCluster(self,all_synsets,methods,start = 0):
+        for stage in range(start,len(methods)):
+            method = methods[stage]
             if method[1] == "independent":
-                for word in self.word_list:
-                    if self.answers[word] is None:
-                        #ret_val returns a tuple of (highest synset, alpha value)
-                        ret_val=method[0](word,self.unresolved[word],all_synsets[word])
+                if self.__pool is not None:
+                    scoreIndependent(self.__pool,self.processes,method[0],[word for word in self.word_list if self.answers[word] is None],self.unresolved,all_synsets)
+                elif hasattr(method[0],"batch"): #Scores the whole vocabulary at once
+                    method[0].batch([word for word in self.word_list if self.answers[word] is None],self.unresolved,all_synsets)
+                else:
+                    for word in self.word_list:
+                        if self.answers[word] is None:
+                            #ret_val returns a tuple of (highest synset, alpha value)
+                            ret_val=method[0](word,self.unresolved[word],all_synsets[word])
             elif method[1] == "dependent":
                 #Dependent one off
                 all_syns=sorted({x for v in all_synsets.itervalues() for x in v})
@@ -243,9 +377,15 @@ class SynsetResolver:
                 for word in self.word_list:
                     if self.answers[word] is None:
                         method[0](all_synsets[word],[i for i in all_syns if i not in all_synsets[word]],self.unresolved[word],[i for i in all_keys if i not in self.unresolved[word]])
+            self.__saveCheckpoint(stage+1,all_synsets)
         if not self.__no_prune:
-            for word in [word for word in self.answers if self.answers[word] is None]:#For probability, we cluster after all methods are finished
-                self.answers[word]=self.pruneCandidates(all_synsets[word])
+            words = [word for word in self.answers if self.answers[word] is None]#For probability, we cluster after all methods are finished
+            if isinstance(self.alpha,int):
+                for word in words:
+                    self.answers[word]=self.pruneCandidates(all_synsets[word])
+            else: #The model scores every candidate of every word in one call
+                for word,best in zip(words,self.__predictBest([all_synsets[word] for word in words])):
+                    self.answers[word]=best
         else:
             self.answers = all_synsets
     ##Takes a bunch of candidates and forces them down into either having one or None. Note, this is the pruning method for our cluster-prob, multi-sieve has it's own method
@@ -254,24 +394,7 @@ class SynsetResolver:
             return False
         else:
             if not isinstance(self.alpha,int):
-                try:
-                    max_can=candidates[0]
-                    hl=len(max_can.getScore())
-
-                    max_score=self.alpha.predict(max_can.getScore())
-                except:
-                    return False
-                if max_score > 10000: #TODO:This shouldn't happen, but does from time to time with regession. Will fix some day
-                    max_score=-1.0
-                for i in range(1,len(candidates)):
-                    score=self.alpha.predict(candidates[i].getScore())
-                    if score > 10000:
-                        score=-1.0
-                    if score > max_score:
-                        max_can=candidates[i]
-                        max_score=score
-                max_can.setScore([max_score],True)
-                return max_can
+                return self.__predictBest([candidates])[0]
 
             else:
                 max_cans=candidates[0]
@@ -284,10 +407,45 @@ class SynsetResolver:
                     return max_cans
                     
         return candidates
-    ##Writes out the scores to a file
+    ##Picks the best candidate of each group with the alpha model. The score vectors of all candidates are
+    #stacked into one matrix so the model is called once, and the best candidate of each group (the first
+    #of any ties) gets the predicted score as its only score
+    #@param groups A list with the candidates of each word
+    #@returns a list with the chosen candidate of each group, or False for a group with no candidates (or when alpha is not a model)
+    def __predictBest(self,groups):
+        if not hasattr(self.alpha,"predict"): #A threshold that is not an int cannot score the candidates
+            return [False for group in groups]
+        counts = [len(group) for group in groups]
+        vectors = [candidate.getScore() for group in groups for candidate in group]
+        if len(vectors) == 0:
+            return [False for group in groups]
+        width = len(vectors[0])
+        for vector in vectors:
+            if len(vector) != width:
+                raise ValueError("Candidates have "+str(len(vector))+" heuristic scores, expected "+str(width))
+        scores = np.asarray(self.alpha.predict(np.array(vectors,dtype=np.float64)),dtype=np.float64).ravel()
+        if len(scores) != len(vectors):
+            raise ValueError("The model gave "+str(len(scores))+" predictions for "+str(len(vectors))+" candidates")
+        with np.errstate(invalid="ignore"):
+            scores[scores > 10000] = -1.0 #TODO:This shouldn't happen, but does from time to time with regession. Will fix some day
+        best = []
+        start = 0
+        for group,position in zip(groups,segmentArgmax(scores,counts)):
+            if position < 0:
+                best.append(False)
+            else:
+                group[position].setScore([scores[start+position]],True)
+                best.append(group[position])
+            start += len(group)
+        return best
+
+    ##Writes out the scores to a file. A file ending in .npz gets the word x candidate x heuristic score array
+    #(see Checkpoint.packScores), anything else gets one line per candidate
     #@param all_synsets
     def saveScore(self,all_synsets):
-        if self.__scores is not None:
+        if self.__scores is not None and self.__scores.endswith(".npz"):
+            np.savez(self.__scores,words=np.array(self.word_list,dtype=unicode),**packScores(self.word_list,all_synsets))
+        elif self.__scores is not None:
             fi=open(self.__scores,'w')
             for word in self.word_list:
                 if len(all_synsets[word]) > 0:
@@ -311,8 +469,11 @@ class SynsetResolver:
     ##Creates a forest of size |clusters| based on the word vector representation of model
     #@param model The word-vector model used to create higher clusters
     #@param clusters a list of clustering methods. If |clusters| = 1, performs the same method until there is a single word left to cluster
+    #@param index (Defaults to the shared ExactCosineIndex of the model) The nearest neighbour index used to name each cluster. Any object with lookup, centroids and nearest (see EmbeddingIndex) can be used
     #@returns a list of all WordNetNodes, with their parents attached
-    def buildForestWordVectors(self,model,clusters,decomposition = None,print_clusters=False):
+    def buildForestWordVectors(self,model,clusters,decomposition = None,print_clusters=False,index = None):
+        if index is None:
+            index = modelIndex(model)
         #These are the initial words to cluster
         if not self.multi_parent:
             words_to_cluster = [self.answers[w] for w in self.answers if self.answers[w] is not None and self.answers[w] is not False]
@@ -321,20 +482,21 @@ class SynsetResolver:
             for w in self.answers:
                 if self.answers[w] is not None and self.answers[w] is not False:
                     if len(self.answers[w]) > 1:
-                        wnn = WordNetNode(w)
+                        wnn = self.createNode(w)
                         for i in self.answers[w]:
                             i.attachChild(wnn,True,self.multi_parent)
                     words_to_cluster.extend(self.answers[w])
         words_to_cluster = list(set(words_to_cluster)) #Make sure they are unique
         #print [str(i) for i in words_to_cluster]
         #First, we remove all words that are not in vocabulary. They are children of no-one
-        not_in_vocab = filter(lambda x:str(x) not in model.wv.vocab,words_to_cluster)
-        words_to_cluster = filter(lambda x:x not in not_in_vocab,words_to_cluster)
+        not_in_vocab = [x for x in words_to_cluster if str(x) not in index]
+        words_to_cluster = [x for x in words_to_cluster if str(x) in index]
         for cluster in clusters:
             if len(words_to_cluster) > 1:
-                for word in words_to_cluster:
-                    word.setScore(model[str(word)])
-                vectors = [word.getScore()[0] for word in words_to_cluster] #We remove all words not in the vocabulary because we cannot really handle them
+                names = [str(word) for word in words_to_cluster]
+                vectors = index.lookup(names) #We remove all words not in the vocabulary because we cannot really handle them
+                for word,vector in zip(words_to_cluster,vectors):
+                    word.setScore(vector)
                 #print vectors
                 if decomposition is not None:
                     vectors = decomposition(vectors)
@@ -348,98 +510,29 @@ class SynsetResolver:
                     #plt.scatter(vectors[:,0],vectors[:,1],c=prediction)
                     #plt.show()
                 #Now, we have to connect the words that were used in the clusters to the ones that were not (so easy in pandas, need minion)
-                for i in range(len(prediction)):
-                    words_to_cluster[i].attachToParent(int(prediction[i]))
-                new_words = map(lambda x:model.most_similar(positive =map(lambda y: str(y),filter(lambda z:z.getParent() == int(x),words_to_cluster)),topn=1)[0][0],np.unique(prediction)) #[word.getScore()[0] for word in words_to_cluster if word.getParent() == x]
-                new_words = [WordNetNode(i) for i in new_words]
-                #TODO:When this is converted to pandas, it will be alot cleaner
-                for i in np.unique(prediction):
-                    for word in words_to_cluster:
-                        if isinstance(word.getParent(),int) and word.getParent() == i:
-                            #word.attachToParent(new_words[i])
-                            new_words[i].attachChild(word)
+                #Each cluster is named by the word closest to the mean of its members, as model.most_similar(positive=members,topn=1)
+                labels = np.unique(prediction)
+                groups = dict((label,[]) for label in labels)
+                for word,label in zip(words_to_cluster,prediction):
+                    groups[label].append(word)
+                members = [[str(word) for word in groups[label]] for label in labels]
+                new_words = [self.createNode(i) for i in index.nearest(index.centroids(names,prediction,labels),members)]
+                for new_word,label in zip(new_words,labels):
+                    for word in groups[label]:
+                        new_word.attachChild(word)
                 words_to_cluster = new_words
                 #for new in words_to_cluster:
                 #    print new.getChildren()
-        return words_to_cluster + not_in_vocab +createWNNs([syn for syn in self.answers if self.answers[syn] is None or self.answers[syn] is False])#This should return the forest, regardless of everything
+        return words_to_cluster + not_in_vocab +createWNNs([syn for syn in self.answers if self.answers[syn] is None or self.answers[syn] is False],self.arena)#This should return the forest, regardless of everything
     
     ##We build a forest from a set of synsets using the WordNet hierarchy.
     #@return This returns a forest, as the roots of the forest
     def buildWordNetForest(self,ans= None):
-        #TODO: Clean this up. This gave me trouble during my diss, and there are definetly better ways of doing this
         if ans is not None:
             self.answers = ans
-        if not self.multi_parent: #Single parent answers, we get the answers themselves
-            all_synsets = [self.answers[syn] for syn in self.answers if self.answers[syn] is not None and self.answers[syn] is not False] #this  makes it go through our answers first
-        else:
-            all_synsets = []
-            for syn in self.answers:#Here, we are getting all the answers for multiparent
-                if self.answers[syn] is not None and self.answers[syn] is not False:
-                    if isinstance(self.answers[syn],list):
-                        all_synsets.extend(self.answers[syn])
-                    else:
-                        all_synsets.append(self.answers[syn])
-
-        #We get a smattering of the nodes themselves
-        syn_dict = {}
-        for syn in all_synsets:
-            syn_dict[str(syn.getSynSet())] = syn
-        all_synsets = syn_dict.values() #throws out WNN that we no longer need
-        #for syn in syn_dict:
-        #    print syn
-        finished_forest = []
-        #Build a bunch of trees
-        counter = 0 
-        for s in self.answers:
-            if self.answers[s] is not None and self.answers[s] is not False:
-                wnn = WordNetNode(s)
-                if isinstance(self.answers[s],list):
-                    for ans in self.answers[s]:
-                        hyp = syn_dict[str(ans.getSynSet())]
-                        if hyp.getParent() is None: #We haven't built the tree yet
-                            counter += 1
-                            hypes = hyp.getSynSet().hypernym_paths()[0] #This provides us with the full path in the tree
-                            prev = hyp
-                            prev.attachChild(wnn,True,self.multi_parent)
-                            for h in hypes[::-1][1:]: #So many slices
-                                h = WordNetNode(h)
-                                h.attachChild(prev) #won't be multi at this step
-                                prev = h
-                                all_synsets.append(h)
-                        else:
-                            hyp.attachChild(wnn,True,self.multi_parent)
-                else: #Single parent hierarhcy
-                    hyp = syn_dict[str(self.answers[s].getSynSet())]
-                    hyp.attachChild(wnn,True,self.multi_parent)
-                    if hyp.getParent() is None: #Here, we are checking to see if we need to add to the parents
-                        hypes = hyp.getSynSet().hypernym_paths()[0] #This provides us with the full path in the tree
-                        prev = hyp
-                        for h in hypes[::-1][1:]: #So many slices
-                            h = WordNetNode(h)
-                            h.attachChild(prev,True,self.multi_parent)
-                            prev = h
-                            all_synsets.append(h)
-        syn_dict = {}
-        for syn in all_synsets:
-            swapped = False
-            if str(syn.getSynSet()) not in syn_dict:
-                syn_dict[str(syn.getSynSet())] = syn #if we haven't found it, we put it in
-            else:
-                #If it's already in the dictionary, then we swap out
-                swapped = True
-                fixer = syn_dict[str(syn.getSynSet())] #This is our new node
-                if syn.getChildren() is not None: #If our old node has any children
-                    for child in syn.getChildren():
-                    #    print "Attaching",str(child.getSynSet()),"to",str(syn.getSynSet())
-                        fixer.attachChild(child,True,self.multi_parent)
-                        child.removeParent(syn)
-                #As a final step, I need to remove the synset from it's parent
-                if syn.getParent() is not None:
-                    syn.getParent().removeChild(syn)
-                    #child.attachToParent(syn_dict[str(syn.getSynSet())])
-            if syn.getParent() is None and not swapped: #We have a root and did not change the connection
-                finished_forest.append(syn)
-        return finished_forest + createWNNs([syn for syn in self.answers if self.answers[syn] is None or self.answers[syn] is False])
+        self.forest = WordNetForest(self.arena)
+        finished_forest = buildHypernymForest(self.answers,self.multi_parent,self.createNode,forest=self.forest)
+        return finished_forest + createWNNs([syn for syn in self.answers if self.answers[syn] is None or self.answers[syn] is False],self.arena)
 
     ##Removes long strains of the tree (i.e, when |children| is one, it is an un-necessary generation)
     #@param tree The initial tree to run through
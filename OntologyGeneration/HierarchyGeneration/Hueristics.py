@@ -6,7 +6,10 @@
 ##Contains a list of heuristics used in word sense disambiguation for a sparse
 ##number of surrounding words
 ###############################################################################
-from nltk.corpus import stopwords
+from Similarity import wuPalmerEngine
+from SparseScoring import jaccardScores
+from WordNetIndexes import definitionIndex,hyponymLemmaIndex
+import numpy as np
 
 ##Uses the Jaccard index to compare one vector to another. It is assumed that the passed in vectors are sorted for faster processing and an error in processing will occur if they are not.
 #@param vec1 The iterable full of values to compare
@@ -14,6 +17,10 @@ from nltk.corpus import stopwords
 #@returns a float of the jacard comparision
 def JaccardCompare(vec1,vec2):
     union_count=len(vec1)+len(vec2)
+    if isinstance(vec1,np.ndarray) or isinstance(vec2,np.ndarray):
+        #Index arrays can be long, so numpy finds the intersection
+        intersection_count=len(np.intersect1d(vec1,vec2,assume_unique=True))
+        return float(intersection_count)/float(union_count-intersection_count)
     intersection_count=0
     i=0
     j=0
@@ -63,35 +70,36 @@ def lemmaHueristic(synset,keywords):
     by the synset'''
     if len(keywords) == 0:
         return 0
-    total_count=0
+    return directHueristic(lemmaSet(synset),keywords)
+
+##The set of lemma names of a synset
+#@param synset The synset, or a WordNetNode holding it
+#@returns a set of the lemma names
+def lemmaSet(synset):
     try:
         lemmas=synset.getSynSet().lemma_names()
     except: #FIX THIS TO BE BETTER
         lemmas=synset.lemma_names()
-    lemmas=set(lemmas)#Must be a set so we have no duplicates
-    return directHueristic(lemmas,keywords)
+    return set(lemmas)#Must be a set so we have no duplicates
+
 
+##If true, childSynsetHueristic scores the lemmas under a synset. The original search never raised its score
+#above 0.0, so it is off by default and the heuristic keeps giving 0.0
+CHILD_LEMMA_SCORES=False
 
-##Examines all child words for a given synset. This is a BFS on all the child synsets
+##Examines all child words for a given synset. The lemmas of the synset and everything below it
+#are read from the hyponym lemma index, so nothing is walked while scoring
 #@param synset The synset being tested
 #@param keywords The list of keywords to be compared against
-#@returns a percentage of found keywords to total keywords, cooresponding to the highest found parameter
-def childSynsetHueristic(synset,keywords):
+#@param depth How many levels of hyponyms to consider. None considers all of them
+#@returns the Jaccard index of the keywords and the lemmas found under the synset, or 0.0 unless CHILD_LEMMA_SCORES is set
+def childSynsetHueristic(synset,keywords,depth = None):
     '''Examines the lemmas of each child to determine if any
-    match can be made. We do a BFS of three levels'''
-    search_items=[synset.getSynSet()]
-    first_next_level=synset
-    score=0.0
-    seen = []
-    while len(search_items) > 0:
-        syn=search_items.pop(0)
-        seen.append(syn)
-        #print synset,len(search_items)#[str(i) for i in syn.hyponyms()]
-        if(score > lemmaHueristic(syn,keywords)):
-            score=lemmaSynHueristic(syn,keywords)
-        new_sets=syn.hyponyms()
-        search_items.extend([i for i in new_sets if i not in seen])         
-    return score
+    match can be made'''
+    if not CHILD_LEMMA_SCORES or len(keywords) == 0:
+        return 0.0
+    index=hyponymLemmaIndex(depth)
+    return JaccardCompare(index.closure(synset.getSynSet()),index.ids(keywords))
 
 ##property Heuristic considers the properties attached to a candidate node, and determines a score based on the jaccard index
 #@param node A wordnet node with attached properties
@@ -116,6 +124,16 @@ def ClusterResolve(candidate,all_synsets):
             max_score=score
     return max_score
 
+##Does ClusterResolve for a group of candidates at once. When everything is a synset the scores are
+#the row maxima of a Wu-Palmer matrix, otherwise ClusterResolve is called for each candidate
+#@param candidates The candidates to test against the others
+#@param all_synsets The list of synsets to perform the test against
+#@returns a list with the maximum score of each candidate
+def clusterScores(candidates,all_synsets):
+    if len(all_synsets) > 0 and not any(isinstance(i.getSynSet(),basestring) for i in candidates+all_synsets):
+        return wuPalmerEngine().maxSimilarity([i.getSynSet() for i in candidates],[i.getSynSet() for i in all_synsets])
+    return [ClusterResolve(can,all_synsets) for can in candidates]
+
 ##Definition resolve considers all information based on the words in the definition
 #and therefore, is a general methods that can build up a vague understanding
 #@param word the word to be resolved
@@ -123,14 +141,15 @@ def ClusterResolve(candidate,all_synsets):
 #@synsets The list of candidate synsets to test
 def definitionResolve(word,keywords,synsets,replace = False):
     methods=[directHueristic]
-    stop_words=stopwords.words("english")
+    if len(synsets) == 0:
+        return None
+    index=definitionIndex()
+    #The definitions are stored as token ids, so the keywords are turned into the same ids
+    tokens=index.keywordTokens(keywords)
     for syn in synsets:
-        diction=syn.getSynSet().definition().split()
-        diction=[word.strip() for word in diction if word not in stop_words]
-        #Removed self.stemmer.stem
-        diction=set([word.lower() for word in diction])
+        diction=index.tokenIds(syn.getSynSet())
         for method in methods:
-            score=method(diction,keywords)
+            score=method(diction,tokens)
             if not replace:
                 syn.setScore(score)
             else:
@@ -138,6 +157,47 @@ def definitionResolve(word,keywords,synsets,replace = False):
                     syn.setScore(score,replace)
     return None
 
+##Sets the scores found for a group of candidates the same way the resolve functions do
+#@param synsets The candidate WordNetNodes
+#@param scores The score of each candidate
+#@param replace If true, a score only replaces the current one when it is higher
+def applyScores(synsets,scores,replace = False):
+    for syn,score in zip(synsets,scores):
+        if not replace:
+            syn.setScore(score)
+        else:
+            if syn.getScore(0) < score:
+                syn.setScore(score,replace)
+
+##Lines up the candidates of a group of words for batch scoring
+#@param words The words to score
+#@param keywords The dictionary of word=>keywords
+#@param all_synsets The dictionary of word=>candidate WordNetNodes
+#@returns a tuple of (candidates,keyword sets,owners) where owners gives the keyword set of each candidate
+def gatherCandidates(words,keywords,all_synsets):
+    candidates=[]
+    keyword_sets=[]
+    owners=[]
+    for word in words:
+        if len(all_synsets[word]) == 0:
+            continue
+        keyword_sets.append(keywords[word])
+        candidates.extend(all_synsets[word])
+        owners.extend([len(keyword_sets)-1]*len(all_synsets[word]))
+    return (candidates,keyword_sets,owners)
+
+##definitionResolve for a whole vocabulary, with every Jaccard score computed in one sparse product
+#@param words The words to resolve
+#@param keywords The dictionary of word=>keywords
+#@param all_synsets The dictionary of word=>candidate WordNetNodes
+#@param replace Determines if the highest score is replaced or added to the WordNetNode
+def definitionResolveBatch(words,keywords,all_synsets,replace = False):
+    (candidates,keyword_sets,owners)=gatherCandidates(words,keywords,all_synsets)
+    index=definitionIndex()
+    keyword_sets=[index.keywordTokens(keys) for keys in keyword_sets]
+    applyScores(candidates,jaccardScores([index.tokenIds(syn.getSynSet()) for syn in candidates],keyword_sets,owners),replace)
+    return None
+
 ##Synonym resolve considers all information based on only the word
 #@param word the word to be resolved
 #@param keywords the list of keywords provided by the system
@@ -154,6 +214,24 @@ def synsetResolve(word,keywords,synsets,replace = False):
                     syn.setScore(score,replace)
     return  None
 
+##synsetResolve for a whole vocabulary, with every lemma score computed in one sparse product
+#@param words The words to resolve
+#@param keywords The dictionary of word=>keywords
+#@param all_synsets The dictionary of word=>candidate WordNetNodes
+#@param replace Determines if the highest score is replaced or added to the WordNetNode
+def synsetResolveBatch(words,keywords,all_synsets,replace = False):
+    (candidates,keyword_sets,owners)=gatherCandidates(words,keywords,all_synsets)
+    lemma_scores=jaccardScores([lemmaSet(syn) for syn in candidates],keyword_sets,owners)
+    #Each candidate is given its scores in the same order as synsetResolve
+    for syn,lemma_score,owner in zip(candidates,lemma_scores,owners):
+        applyScores([syn],[lemma_score],replace)
+        applyScores([syn],[childSynsetHueristic(syn,keyword_sets[owner])],replace)
+    return None
+
+#SynsetResolver uses the batch form of a method when it has one
+synsetResolve.batch=synsetResolveBatch
+definitionResolve.batch=definitionResolveBatch
+
 ##Property resolve considers all information based on the additional properties of the word
 #@param word the word to be resolved
 #@param keywords the list of keywords provided by the system
@@ -189,27 +267,18 @@ def pathClustering(known_synset,keywords,candidates,candidate_keywords):
 #@param all_synset_keywords not used
 #@param replace Determines if the highest score is replaced or added to the wordNetNode
 def pathResolve(candidates,all_synsets,keywords,all_synset_keywords,replace = False):
-    methods=[ClusterResolve]
     if len(all_synsets) == 0:
         return None
-    for can in candidates:
-        for method in methods:
-            score=method(can,all_synsets)
-            if not replace:
-                can.setScore(score)
-            else:
-                if can.getScore(0) < score:
-                    can.setScore(score,replace)                
+    for can,score in zip(candidates,clusterScores(candidates,all_synsets)):
+        if not replace:
+            can.setScore(score)
+        else:
+            if can.getScore(0) < score:
+                can.setScore(score,replace)                
     return None
 
 def clusterMaxResolve(candidates,all_synsets,keywords,all_synset_keywords,replace = False):
-    methods=[ClusterResolve]
-    scores=[]
-    for can in candidates:
-        for method in methods:
-            score=method(can,all_synsets)
-            scores.append(score)
-            #can.setScore(can.getScore()+score)
+    scores=clusterScores(candidates,all_synsets)
     if len(scores) > 0:
         avg=float(sum(scores))
         if abs(avg) > 0.001:
@@ -0,0 +1,112 @@
+###############################################################################
+##ParallelResolve.py
+##Last Modified: 10-18-2026
+##
+##Runs the independent methods of the SynsetResolver over a pool of processes.
+##Words are sent to the workers as synset offsets and scores, and only the
+##score vectors come back, so no Synset objects are pickled
+###############################################################################
+import multiprocessing
+from nltk.corpus import wordnet as wn
+from nltk.corpus import stopwords
+from ..DataStructures import WordNetNode
+from WordNetIndexes import hyponymLemmaIndex,definitionIndex
+import Hueristics
+
+##Turns a synset (or a string standing in for one) into something small that can be sent to a worker
+#@param synset The synset or string
+#@returns a tuple that unpackSynset can turn back into the synset
+def packSynset(synset):
+    if isinstance(synset,basestring):
+        return ("w",synset)
+    return ("s",synset.pos(),synset.offset())
+
+##Turns a packed synset back into a synset
+#@param packed A tuple made by packSynset
+#@returns the synset (or string) that was packed
+def unpackSynset(packed):
+    if packed[0] == "w":
+        return packed[1]
+    return wn.synset_from_pos_and_offset(packed[1],packed[2])
+
+##Packs a keyword set, which may hold synsets as well as strings (see parseList)
+#@param keywords The set of keywords (or None)
+#@returns a list of packed keywords, or None
+def packKeywords(keywords):
+    if keywords is None:
+        return None
+    return [packSynset(key) for key in keywords]
+
+##Turns packed keywords back into a keyword set
+#@param packed A list made by packKeywords (or None)
+#@returns a set of keywords, or None
+def unpackKeywords(packed):
+    if packed is None:
+        return None
+    return set(unpackSynset(key) for key in packed)
+
+##Loads WordNet (and the stopwords) in a worker before any work is given to it
+def initializeWorker():
+    wn.ensure_loaded()
+    stopwords.ensure_loaded()
+    #A forked worker shares the open data files (and their read positions) with its parent,
+    #so each worker opens its own. The reader keeps its open files in _data_file_map (nltk 3.x,
+    #checked against 3.4.5) and opens a file again when it is missing from the map
+    if hasattr(wn,"_data_file_map"):
+        wn._data_file_map={}
+
+##Runs an independent method on a shard of words inside a worker
+#@param job A tuple of (method,replace,items) where each item is (word,packed keywords,[(packed synset,scores)])
+#@returns a list with the new score vector of every candidate of every word in the shard
+def scoreShard(job):
+    (method,replace,items)=job
+    results=[]
+    for (word,keywords,candidates) in items:
+        nodes=[]
+        for (packed,scores) in candidates:
+            node=WordNetNode(unpackSynset(packed))
+            node.setScore(list(scores))
+            nodes.append(node)
+        if replace:
+            method(word,unpackKeywords(keywords),nodes,True)
+        else:
+            method(word,unpackKeywords(keywords),nodes)
+        results.append([list(node.getScore()) for node in nodes])
+    return results
+
+##Creates the pool of workers used by the resolver. The shared indexes are loaded (and built if the cache is cold)
+#here before forking, so the workers inherit them instead of each building its own
+#@param processes The number of worker processes
+#@returns a multiprocessing pool with WordNet loaded in each worker
+def createPool(processes):
+    if Hueristics.CHILD_LEMMA_SCORES:
+        hyponymLemmaIndex().load()
+    definitionIndex().load()
+    definitionIndex().stopWords()
+    return multiprocessing.Pool(processes,initializer=initializeWorker)
+
+##Runs an independent method over a list of words using a pool of workers, and merges the
+#returned scores into the candidate WordNetNodes
+#@param pool The pool made by createPool
+#@param processes The number of processes in the pool
+#@param method The independent method, which must be a module level function so it can be sent to the workers
+#@param words The words to resolve
+#@param keywords The dictionary of word=>keywords
+#@param all_synsets The dictionary of word=>candidate WordNetNodes
+#@param replace Passed on to the method (the multi-sieve keeps only the highest score)
+#@param shards_per_process How many pieces the word list is cut into for each worker
+def scoreIndependent(pool,processes,method,words,keywords,all_synsets,replace = False,shards_per_process = 4):
+    words=[word for word in words if len(all_synsets[word]) > 0]
+    if len(words) == 0:
+        return None
+    shard_count=max(1,min(len(words),processes*shards_per_process))
+    shards=[words[i::shard_count] for i in range(shard_count)]
+    jobs=[]
+    for shard in shards:
+        items=[(word,packKeywords(keywords[word]),[(packSynset(node.getSynSet()),node.getScore()) for node in all_synsets[word]]) for word in shard]
+        jobs.append((method,replace,items))
+    for shard,results in zip(shards,pool.map(scoreShard,jobs)):
+        for word,scores in zip(shard,results):
+            for node,score in zip(all_synsets[word],scores):
+                node.setScore(score)
+    return None
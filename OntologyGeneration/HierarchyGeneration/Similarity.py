@@ -0,0 +1,177 @@
+###############################################################################
+##Similarity.py
+##Last Modified: 10-18-2026
+##
+##Computes Wu-Palmer similarity between whole groups of synsets at once with
+##numpy. The numbers are the same as nltk's wup_similarity, including its fake
+##root for verbs and the way it picks a subsumer when there are ties
+###############################################################################
+from collections import deque
+import numpy as np
+
+##The name nltk gives its fake root. It sorts before every real synset name
+FAKE_ROOT="*ROOT*"
+
+##Holds what is needed about each synset (ancestor distances, depths) and computes
+#candidate x reference similarity matrices from them
+class WuPalmerEngine:
+    ##Sets up the engine. Synsets are added as they are seen
+    #@param chunk_size The largest number of (candidate,reference,ancestor) cells worked on at once
+    def __init__(self,chunk_size = 1<<24):
+        ##The upper bound on the size of the intermediate arrays
+        self.chunk_size=chunk_size
+
+        ##synset=>dictionary of ancestor=>shortest distance (including the synset itself at 0)
+        self.__distances={}
+
+        ##synset=>dictionary of ancestor=>shortest path distance between the synset and that ancestor
+        self.__paths={}
+
+        ##The reference side of the last matrix, reused because the resolver compares many words against the same references
+        self.__last_references=None
+
+    ##The shortest hypernym distances from a synset to all its ancestors, found the same way nltk does (breadth first)
+    #@param synset The synset
+    #@returns a dictionary of ancestor=>distance
+    def distances(self,synset):
+        if synset not in self.__distances:
+            queue=deque([(synset,0)])
+            path={}
+            while queue:
+                s,depth=queue.popleft()
+                if s in path:
+                    continue
+                path[s]=depth
+                depth+=1
+                queue.extend((hyp,depth) for hyp in s.hypernyms())
+                queue.extend((hyp,depth) for hyp in s.instance_hypernyms())
+            self.__distances[synset]=path
+        return self.__distances[synset]
+
+    ##The shortest path distance (as nltk's shortest_path_distance) between a synset and each of its ancestors
+    #@param synset The synset
+    #@returns a dictionary of ancestor=>path distance
+    def paths(self,synset):
+        if synset not in self.__paths:
+            mine=self.distances(synset)
+            paths={}
+            for ancestor in mine:
+                theirs=self.distances(ancestor)
+                paths[ancestor]=min(mine[x]+theirs[x] for x in theirs)
+            self.__paths[synset]=paths
+        return self.__paths[synset]
+
+    ##The distance from a synset to the fake root, which nltk puts one past the synset's furthest ancestor
+    def rootDistance(self,synset):
+        return max(self.distances(synset).itervalues())+1
+
+    ##Builds (or reuses) the reference side of the matrix. Columns are the ancestors of the references
+    #plus the fake root, ordered the way nltk would choose between them as a subsumer
+    #@param references A list of synsets
+    #@returns a tuple of (column dictionary,min depths,max depths,ancestor matrix,path matrix)
+    def __referenceSide(self,references):
+        key=tuple(references)
+        if self.__last_references is not None and self.__last_references[0] == key:
+            return self.__last_references[1]
+        ancestors=set()
+        for ref in references:
+            ancestors.update(self.distances(ref))
+        ordered=sorted(ancestors,key=lambda s:(-s.min_depth(),s.name()))
+        #The fake root goes first among the depth 0 columns
+        position=len([s for s in ordered if s.min_depth() > 0])
+        columns=dict((s,i if i < position else i+1) for i,s in enumerate(ordered))
+        fake=position
+        width=len(ordered)+1
+        min_depth=np.zeros(width,dtype=np.int64)
+        max_depth=np.zeros(width,dtype=np.int64)
+        for s,i in columns.iteritems():
+            min_depth[i]=s.min_depth()
+            max_depth[i]=s.max_depth()
+        is_ancestor=np.zeros((len(references),width),dtype=bool)
+        path=np.zeros((len(references),width),dtype=np.float64)
+        for row,ref in enumerate(references):
+            for ancestor,distance in self.paths(ref).iteritems():
+                is_ancestor[row,columns[ancestor]]=True
+                path[row,columns[ancestor]]=distance
+            #Every reference reaches the fake root
+            is_ancestor[row,fake]=True
+            path[row,fake]=self.rootDistance(ref)
+        side=(columns,fake,min_depth,max_depth,is_ancestor,path)
+        self.__last_references=(key,side)
+        return side
+
+    ##Computes the Wu-Palmer similarity of every candidate against every reference
+    #@param candidates A list of synsets (the "self" side of wup_similarity)
+    #@param references A list of synsets (the "other" side of wup_similarity)
+    #@returns a len(candidates) x len(references) array, with nan where nltk would give None
+    def similarity(self,candidates,references):
+        result=np.empty((len(candidates),len(references)),dtype=np.float64)
+        result.fill(np.nan)
+        if len(candidates) == 0 or len(references) == 0:
+            return result
+        (columns,fake,min_depth,max_depth,ref_ancestor,ref_path)=self.__referenceSide(references)
+        width=len(min_depth)
+        can_ancestor=np.zeros((len(candidates),width),dtype=bool)
+        can_path=np.zeros((len(candidates),width),dtype=np.float64)
+        self_column=np.empty(len(candidates),dtype=np.int64)
+        self_column.fill(-1)
+        for row,can in enumerate(candidates):
+            for ancestor,distance in self.paths(can).iteritems():
+                if ancestor in columns:
+                    can_ancestor[row,columns[ancestor]]=True
+                    can_path[row,columns[ancestor]]=distance
+            #nltk only adds the fake root when the candidate needs one, which in WordNet 3.0 is only for verbs
+            can_ancestor[row,fake]=can.pos() == "v"
+            can_path[row,fake]=self.rootDistance(can)
+            if can in columns:
+                self_column[row]=columns[can]
+        step=max(1,self.chunk_size//(len(references)*width))
+        reference_rows=np.arange(len(references))[np.newaxis,:]
+        for start in range(0,len(candidates),step):
+            stop=min(len(candidates),start+step)
+            common=can_ancestor[start:stop,np.newaxis,:] & ref_ancestor[np.newaxis,:,:]
+            found=common.any(axis=2)
+            #The first common column is the deepest (by min depth), then first by name
+            subsumer=common.argmax(axis=2)
+            own=self_column[start:stop]
+            has_own=own >= 0
+            if has_own.any():
+                #nltk prefers the candidate itself when it is one of the deepest common ancestors
+                own_column=np.where(has_own,own,0)
+                own_common=ref_ancestor[:,own_column].T & has_own[:,np.newaxis]
+                own_deepest=min_depth[own_column][:,np.newaxis] == min_depth[subsumer]
+                subsumer=np.where(own_common & own_deepest,own_column[:,np.newaxis],subsumer)
+            depth=max_depth[subsumer]+1
+            candidate_rows=np.arange(stop-start)[:,np.newaxis]
+            len1=can_path[start:stop][candidate_rows,subsumer]+depth
+            len2=ref_path[reference_rows,subsumer]+depth
+            chunk=(2.0*depth)/(len1+len2)
+            chunk[~found]=np.nan
+            result[start:stop]=chunk
+        return result
+
+    ##The highest similarity between each candidate and any reference (as ClusterResolve)
+    #@param candidates A list of synsets
+    #@param references A list of synsets
+    #@returns a list with the maximum score of each candidate, or None when every score is None
+    def maxSimilarity(self,candidates,references):
+        matrix=self.similarity(candidates,references)
+        scores=[]
+        for row in matrix:
+            row=row[~np.isnan(row)]
+            if len(row) == 0:
+                scores.append(None)
+            else:
+                scores.append(float(row.max()))
+        return scores
+
+##The shared engine, so ancestor information is kept between calls
+wu_palmer_engine=None
+
+##Gets the shared Wu-Palmer engine, creating it the first time
+#@returns the WuPalmerEngine used by the heuristics
+def wuPalmerEngine():
+    global wu_palmer_engine
+    if wu_palmer_engine is None:
+        wu_palmer_engine=WuPalmerEngine()
+    return wu_palmer_engine
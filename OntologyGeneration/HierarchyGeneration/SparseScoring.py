@@ -0,0 +1,86 @@
+###############################################################################
+##SparseScoring.py
+##Last Modified: 10-18-2026
+##
+##Scores many bags of words against their keyword sets at once. Tokens are
+##interned into a vocabulary, the bags and keyword sets become sparse 0/1
+##matrices, and the Jaccard index (as directHueristic) of every bag comes from
+##a single elementwise product. scipy is used when it is installed, otherwise
+##the sets are intersected one at a time
+###############################################################################
+import numpy as np
+try:
+    import scipy.sparse as sparse
+except ImportError:
+    sparse = None
+
+##Interns tokens into consecutive integer ids
+class TokenVocabulary:
+    ##Creates an empty vocabulary
+    def __init__(self):
+        ##token=>id
+        self.ids={}
+
+    ##Gets the id of a token, adding it if needed
+    #@param token Any hashable token (words, or synsets when the keywords are synsets)
+    #@returns the integer id of the token
+    def intern(self,token):
+        if token not in self.ids:
+            self.ids[token]=len(self.ids)
+        return self.ids[token]
+
+    ##Gets the id of a token without adding it
+    #@param token The token to look up
+    #@returns the integer id, or None if the token has not been interned
+    def lookup(self,token):
+        return self.ids.get(token)
+
+    def __len__(self):
+        return len(self.ids)
+
+##Builds a sparse 0/1 matrix with a row for each bag, keeping only the tokens in the vocabulary
+#@param bags A list of sets of tokens
+#@param vocabulary The TokenVocabulary that gives the columns
+#@param add If true, tokens not in the vocabulary are added to it
+#@returns a CSR matrix of len(bags) x len(vocabulary)
+def bagMatrix(bags,vocabulary,add = False):
+    indptr=[0]
+    indices=[]
+    for bag in bags:
+        for token in bag:
+            if add:
+                indices.append(vocabulary.intern(token))
+            else:
+                column=vocabulary.lookup(token)
+                if column is not None:
+                    indices.append(column)
+        indptr.append(len(indices))
+    data=np.ones(len(indices),dtype=np.int32)
+    return sparse.csr_matrix((data,np.array(indices,dtype=np.int64),np.array(indptr,dtype=np.int64)),shape=(len(bags),len(vocabulary)))
+
+##Computes the Jaccard index of each bag against the keyword set of its word, giving the same
+#numbers as directHueristic (including 0 when the keyword set is empty)
+#@param bags A list of sets of tokens, one for each candidate
+#@param keyword_sets A list of keyword sets, one for each word
+#@param owners A list giving the position in keyword_sets of the word each bag belongs to
+#@returns a list with the score of each bag
+def jaccardScores(bags,keyword_sets,owners):
+    keyword_sizes=[len(keywords) for keywords in keyword_sets]
+    if sparse is None:
+        return [0 if keyword_sizes[owner] == 0 else float(len(bag & keyword_sets[owner]))/len(bag | keyword_sets[owner]) for bag,owner in zip(bags,owners)]
+    if len(bags) == 0:
+        return []
+    vocabulary=TokenVocabulary()
+    keyword_matrix=bagMatrix(keyword_sets,vocabulary,True)
+    #Tokens outside the keywords can never be in an intersection, so they only count towards the bag size
+    bag_matrix=bagMatrix(bags,vocabulary)
+    owners=np.array(owners,dtype=np.int64)
+    intersection=np.asarray(bag_matrix.multiply(keyword_matrix[owners]).sum(axis=1)).ravel()
+    union=np.array([len(bag) for bag in bags],dtype=np.int64)+np.array(keyword_sizes,dtype=np.int64)[owners]-intersection
+    scores=[]
+    for inter,total,owner in zip(intersection,union,owners):
+        if keyword_sizes[owner] == 0:
+            scores.append(0)
+        else:
+            scores.append(float(inter)/float(total))
+    return scores
@@ -0,0 +1,450 @@
+###############################################################################
+##WordNetIndexes.py
+##Last Modified: 10-18-2026
+##
+##Holds indexes over the whole of WordNet that are built once, kept on disk,
+##and used by the generators and heuristics instead of walking WordNet per word
+###############################################################################
+from nltk.corpus import wordnet as wn
+from nltk.corpus import stopwords
+from ..IndexCache import cachePath,wordNetVersion,saveArrays,loadArrays
+import numpy as np
+import hashlib
+
+##Gets the place of a synset in the WordNet data files. Satellite adjectives live in the same data file (and offset
+#space) as the other adjectives
+#@param synset The synset
+#@returns a tuple of (data file pos,offset)
+def dataKey(synset):
+    pos=synset.pos()
+    if pos == "s":
+        pos="a"
+    return (pos,synset.offset())
+
+##The set of verb synsets that can be agent actions, which are the verbs with a
+#"Somebody ..." sentence frame on at least one of their lemmas
+class AgentiveVerbIndex:
+    ##Sets up the index. Nothing is built or loaded until it is used
+    #@param path The file the index is kept in. Defaults to agentive_verbs.npz in the cache directory
+    #@param keyword The subject that marks a frame as an agent frame
+    def __init__(self,path=None,keyword="Somebody"):
+        if path is None:
+            path=cachePath("agentive_verbs.npz")
+
+        ##The location of the index
+        self.path=path
+
+        ##The string searched for in the frames
+        self.keyword=keyword
+
+        ##The offsets of the agentive verbs, filled in on first use
+        self.__offsets=None
+
+    ##Tests if a single synset can be an agent action by looking at its frames
+    #@param synset The verb synset to test
+    #@returns True if any lemma has a frame containing the keyword
+    def isAgentive(self,synset):
+        for lemma in synset.lemmas():
+            for s in lemma.frame_strings():
+                if self.keyword in s:
+                    return True
+        return False
+
+    ##Builds the index by going through every verb in WordNet
+    #@returns a sorted array of the offsets of all agentive verbs
+    def build(self):
+        return np.array(sorted(syn.offset() for syn in wn.all_synsets(wn.VERB) if self.isAgentive(syn)),dtype=np.int64)
+
+    ##Loads the index from disk, building and saving it if it is missing or out of date
+    def load(self):
+        if self.__offsets is None:
+            stamp=wordNetVersion()+":"+self.keyword
+            arrays=loadArrays(self.path,stamp)
+            if arrays is None:
+                arrays={"offsets":self.build()}
+                saveArrays(self.path,stamp,**arrays)
+            self.__offsets=frozenset(arrays["offsets"].tolist())
+        return self.__offsets
+
+    ##Membership test, so a synset is in the index if it can be an agent action
+    def __contains__(self,synset):
+        return synset.pos() == wn.VERB and synset.offset() in self.load()
+
+    def __len__(self):
+        return len(self.load())
+
+##The shared agentive verb index
+agentive_verbs=None
+
+##Gets the shared agentive verb index, creating it the first time
+#@returns the AgentiveVerbIndex used by the generators
+def agentiveVerbIndex():
+    global agentive_verbs
+    if agentive_verbs is None:
+        agentive_verbs=AgentiveVerbIndex()
+    return agentive_verbs
+
+##The set of synsets that descend from a root synset (including the root itself), following
+#both hyponyms and instance hyponyms. Used to test if a noun is a physical entity, artifact, location, etc.
+class DescendantIndex:
+    ##Sets up the index. Nothing is built or loaded until it is used
+    #@param root The name of the root synset (i.e. "physical_entity.n.01")
+    #@param path The file the index is kept in. Defaults to descendants_<root>.npz in the cache directory
+    def __init__(self,root,path=None):
+        if path is None:
+            path=cachePath("descendants_"+root+".npz")
+
+        ##The name of the root synset
+        self.root=root
+
+        ##The location of the index
+        self.path=path
+
+        ##The offsets of the descendants, filled in on first use
+        self.__offsets=None
+
+    ##Builds the index by walking down from the root
+    #@returns a sorted array of the offsets of the root and all its descendants
+    def build(self):
+        root=wn.synset(self.root)
+        descendants=set([root])
+        queue=[root]
+        while len(queue) > 0:
+            syn=queue.pop()
+            for child in syn.hyponyms()+syn.instance_hyponyms():
+                if child not in descendants:
+                    descendants.add(child)
+                    queue.append(child)
+        return np.array(sorted(syn.offset() for syn in descendants),dtype=np.int64)
+
+    ##Loads the index from disk, building and saving it if it is missing or out of date
+    def load(self):
+        if self.__offsets is None:
+            stamp=wordNetVersion()+":"+self.root
+            arrays=loadArrays(self.path,stamp)
+            if arrays is None:
+                arrays={"offsets":self.build()}
+                saveArrays(self.path,stamp,**arrays)
+            self.__offsets=frozenset(arrays["offsets"].tolist())
+        return self.__offsets
+
+    ##Membership test, so a synset is in the index if it is the root or one of its descendants
+    def __contains__(self,synset):
+        return synset.pos() == self.root.split(".")[-2] and synset.offset() in self.load()
+
+    def __len__(self):
+        return len(self.load())
+
+##The shared descendant indexes, by root name
+descendant_indexes={}
+
+##Gets the shared descendant index of a root, creating it the first time
+#@param root The name of the root synset
+#@returns the DescendantIndex of the root
+def descendantIndex(root):
+    if root not in descendant_indexes:
+        descendant_indexes[root]=DescendantIndex(root)
+    return descendant_indexes[root]
+
+##The cleaned up words of every WordNet definition, stored as interned integer ids. A definition is
+#split on whitespace, the stop words are dropped, and what is left is lower cased (as definitionResolve always did)
+class DefinitionIndex:
+    ##Sets up the index. Nothing is built or loaded until it is used
+    #@param path The file the index is kept in. Defaults to definitions_<language>.npz in the cache directory
+    #@param language The stopwords list to drop from the definitions
+    def __init__(self,path=None,language="english"):
+        if path is None:
+            path=cachePath("definitions_"+language+".npz")
+
+        ##The location of the index
+        self.path=path
+
+        ##The name of the stopwords list
+        self.language=language
+
+        ##The stop words, as a set so each test is a hash lookup
+        self.__stop_words=None
+
+        ##token=>id, filled in on first use
+        self.__vocabulary=None
+
+        ##(data file,offset)=>row of the synset in the index
+        self.__rows=None
+
+        ##The start of each row in the ids, and the ids themselves
+        self.__indptr=None
+        self.__indices=None
+
+        ##synset=>frozenset of token ids, for the synsets that have been looked up
+        self.__cache={}
+
+    ##Gets the stop words as a frozen set
+    def stopWords(self):
+        if self.__stop_words is None:
+            self.__stop_words=frozenset(stopwords.words(self.language))
+        return self.__stop_words
+
+    ##Cleans up a definition the way definitionResolve does
+    #@param definition The definition of a synset
+    #@returns a set of the lower cased non stop words
+    def tokenize(self,definition):
+        stop_words=self.stopWords()
+        return set(word.strip().lower() for word in definition.split() if word not in stop_words)
+
+    ##Builds the index with a single pass over every WordNet definition
+    #@returns a dictionary of the arrays that make up the index
+    def build(self):
+        vocabulary={}
+        pos=[]
+        offsets=[]
+        indptr=[0]
+        indices=[]
+        for syn in wn.all_synsets():
+            (p,offset)=dataKey(syn)
+            pos.append(p)
+            offsets.append(offset)
+            for token in self.tokenize(syn.definition()):
+                if token not in vocabulary:
+                    vocabulary[token]=len(vocabulary)
+                indices.append(vocabulary[token])
+            indptr.append(len(indices))
+        tokens=[None]*len(vocabulary)
+        for token,i in vocabulary.iteritems():
+            tokens[i]=token
+        return {"tokens":np.array(tokens,dtype=np.unicode_),
+                "pos":np.array(pos),
+                "offsets":np.array(offsets,dtype=np.int64),
+                "indptr":np.array(indptr,dtype=np.int64),
+                "indices":np.array(indices,dtype=np.int32)}
+
+    ##Loads the index from disk, building and saving it if it is missing or out of date
+    def load(self):
+        if self.__vocabulary is None:
+            stamp=wordNetVersion()+":"+self.language+":"+hashlib.md5(u"\n".join(sorted(self.stopWords())).encode("utf-8")).hexdigest()
+            arrays=loadArrays(self.path,stamp)
+            if arrays is None:
+                arrays=self.build()
+                saveArrays(self.path,stamp,**arrays)
+            self.__vocabulary=dict((token,i) for i,token in enumerate(arrays["tokens"].tolist()))
+            self.__rows=dict((key,row) for row,key in enumerate(zip(arrays["pos"].tolist(),arrays["offsets"].tolist())))
+            self.__indptr=arrays["indptr"]
+            self.__indices=arrays["indices"]
+        return self.__vocabulary
+
+    ##Gets the cleaned up definition of a synset as token ids
+    #@param synset The synset
+    #@returns a frozenset of the ids of the words in the definition
+    def tokenIds(self,synset):
+        if synset not in self.__cache:
+            self.load()
+            row=self.__rows.get(dataKey(synset))
+            if row is None: #Not in the WordNet the index was built from, so it is done directly
+                ids=frozenset(self.keywordTokens(self.tokenize(synset.definition())))
+            else:
+                ids=frozenset(self.__indices[self.__indptr[row]:self.__indptr[row+1]].tolist())
+            self.__cache[synset]=ids
+        return self.__cache[synset]
+
+    ##Turns a set of keywords into the tokens of the index. Keywords that are not in any definition are
+    #kept as they are, so they still count towards the size of the set but can never be matched
+    #@param keywords The set of keywords
+    #@returns a set of token ids (and unmatched keywords)
+    def keywordTokens(self,keywords):
+        vocabulary=self.load()
+        return set(vocabulary.get(key,key) if isinstance(key,basestring) else key for key in keywords)
+
+    def __len__(self):
+        return len(self.load())
+
+##The shared definition indexes, by stopwords language
+definition_indexes={}
+
+##Gets the shared definition index, creating it the first time
+#@param language The stopwords list to drop from the definitions
+#@returns the DefinitionIndex used by definitionResolve
+def definitionIndex(language="english"):
+    if language not in definition_indexes:
+        definition_indexes[language]=DefinitionIndex(language=language)
+    return definition_indexes[language]
+
+##The lemma names found under every synset: the lemmas of the synset and of everything reached through
+#hyponyms (optionally only a few levels down). The lemma names are numbered in sorted order, so each
+#synset's lemmas are kept as a sorted array of ids that JaccardCompare can use directly
+class HyponymLemmaIndex:
+    ##Sets up the index. Nothing is built or loaded until it is used
+    #@param depth How many levels of hyponyms to include. None includes all of them
+    #@param path The file the index is kept in. Defaults to hyponym_lemmas_<depth>.npz in the cache directory
+    def __init__(self,depth=None,path=None):
+        if path is None:
+            path=cachePath("hyponym_lemmas_"+("all" if depth is None else str(depth))+".npz")
+
+        ##The number of levels followed down, or None for all
+        self.depth=depth
+
+        ##The location of the index
+        self.path=path
+
+        ##lemma name=>id, filled in on first use
+        self.__vocabulary=None
+
+        ##(data file,offset)=>row of the synset in the index
+        self.__rows=None
+
+        ##The start of each row in the ids, and the ids themselves
+        self.__indptr=None
+        self.__indices=None
+
+    ##Builds the index. The hyponym links are read from WordNet once and then followed as row numbers
+    #@returns a dictionary of the arrays that make up the index
+    def build(self):
+        synsets=list(wn.all_synsets())
+        rows=dict((syn,row) for row,syn in enumerate(synsets))
+        lemmas=sorted(set(name for syn in synsets for name in syn.lemma_names()))
+        vocabulary=dict((name,i) for i,name in enumerate(lemmas))
+        own=[[vocabulary[name] for name in syn.lemma_names()] for syn in synsets]
+        children=[[rows[child] for child in syn.hyponyms()] for syn in synsets]
+        indptr=[0]
+        indices=[]
+        for start in range(len(synsets)):
+            ids=set(own[start])
+            seen=set([start])
+            level=[start]
+            depth=0
+            while len(level) > 0 and (self.depth is None or depth < self.depth):
+                next_level=[]
+                for row in level:
+                    for child in children[row]:
+                        if child not in seen:
+                            seen.add(child)
+                            next_level.append(child)
+                            ids.update(own[child])
+                level=next_level
+                depth+=1
+            indices.extend(sorted(ids))
+            indptr.append(len(indices))
+        keys=[dataKey(syn) for syn in synsets]
+        return {"lemmas":np.array(lemmas,dtype=np.unicode_),
+                "pos":np.array([key[0] for key in keys]),
+                "offsets":np.array([key[1] for key in keys],dtype=np.int64),
+                "indptr":np.array(indptr,dtype=np.int64),
+                "indices":np.array(indices,dtype=np.int32)}
+
+    ##Loads the index from disk, building and saving it if it is missing or out of date
+    def load(self):
+        if self.__vocabulary is None:
+            stamp=wordNetVersion()+":"+str(self.depth)
+            arrays=loadArrays(self.path,stamp)
+            if arrays is None:
+                arrays=self.build()
+                saveArrays(self.path,stamp,**arrays)
+            self.__vocabulary=dict((name,i) for i,name in enumerate(arrays["lemmas"].tolist()))
+            self.__rows=dict((key,row) for row,key in enumerate(zip(arrays["pos"].tolist(),arrays["offsets"].tolist())))
+            self.__indptr=arrays["indptr"]
+            self.__indices=arrays["indices"]
+        return self.__vocabulary
+
+    ##Gets the lemmas under a synset
+    #@param synset The synset
+    #@returns a sorted array of lemma ids
+    def closure(self,synset):
+        self.load()
+        row=self.__rows[dataKey(synset)]
+        return self.__indices[self.__indptr[row]:self.__indptr[row+1]]
+
+    ##Turns a set of keywords (or lemma names) into lemma ids. Anything that is not a lemma name is
+    #given an id past the end of the vocabulary, so it counts towards the size of the set but is never matched
+    #@param keywords The set of keywords
+    #@returns a sorted list of ids
+    def ids(self,keywords):
+        vocabulary=self.load()
+        ids=[]
+        unknown=len(vocabulary)
+        for key in set(keywords):
+            if isinstance(key,basestring) and key in vocabulary:
+                ids.append(vocabulary[key])
+            else:
+                ids.append(unknown)
+                unknown+=1
+        return sorted(ids)
+
+    def __len__(self):
+        return len(self.load())
+
+##The shared hyponym lemma indexes, by depth
+hyponym_lemma_indexes={}
+
+##Gets the shared hyponym lemma index of a depth, creating it the first time
+#@param depth How many levels of hyponyms to include. None includes all of them
+#@returns the HyponymLemmaIndex of that depth
+def hyponymLemmaIndex(depth=None):
+    if depth not in hyponym_lemma_indexes:
+        hyponym_lemma_indexes[depth]=HyponymLemmaIndex(depth)
+    return hyponym_lemma_indexes[depth]
+
+##The primary hypernym of every synset, which is the parent along hypernym_paths()[0] (the first of its
+#hypernyms and instance hypernyms). Following it upward from a synset gives the same path buildWordNetForest uses
+class HypernymParentIndex:
+    ##Sets up the index. Nothing is built or loaded until it is used
+    #@param path The file the index is kept in. Defaults to hypernym_parents.npz in the cache directory
+    def __init__(self,path=None):
+        if path is None:
+            path=cachePath("hypernym_parents.npz")
+
+        ##The location of the index
+        self.path=path
+
+        ##(pos,offset)=>(pos,offset) of the primary hypernym, filled in on first use
+        self.__parents=None
+
+    ##Builds the index by reading the hypernyms of every synset once
+    #@returns a dictionary of the arrays that make up the index
+    def build(self):
+        pos=[]
+        offsets=[]
+        parent_pos=[]
+        parent_offsets=[]
+        for syn in wn.all_synsets():
+            hypernyms=syn.hypernyms()+syn.instance_hypernyms()
+            if len(hypernyms) > 0:
+                pos.append(syn.pos())
+                offsets.append(syn.offset())
+                parent_pos.append(hypernyms[0].pos())
+                parent_offsets.append(hypernyms[0].offset())
+        return {"pos":np.array(pos),
+                "offsets":np.array(offsets,dtype=np.int64),
+                "parent_pos":np.array(parent_pos),
+                "parent_offsets":np.array(parent_offsets,dtype=np.int64)}
+
+    ##Loads the index from disk, building and saving it if it is missing or out of date
+    def load(self):
+        if self.__parents is None:
+            stamp=wordNetVersion()
+            arrays=loadArrays(self.path,stamp)
+            if arrays is None:
+                arrays=self.build()
+                saveArrays(self.path,stamp,**arrays)
+            self.__parents=dict(zip(zip(arrays["pos"].tolist(),arrays["offsets"].tolist()),zip(arrays["parent_pos"].tolist(),arrays["parent_offsets"].tolist())))
+        return self.__parents
+
+    ##Gets the primary hypernym of a synset
+    #@param synset The synset
+    #@returns the parent synset, or None if the synset is a root
+    def parent(self,synset):
+        found=self.load().get((synset.pos(),synset.offset()))
+        if found is None:
+            return None
+        return wn.synset_from_pos_and_offset(found[0],found[1])
+
+    def __len__(self):
+        return len(self.load())
+
+##The shared hypernym parent index
+hypernym_parents=None
+
+##Gets the shared hypernym parent index, creating it the first time
+#@returns the HypernymParentIndex used when building forests
+def hypernymParentIndex():
+    global hypernym_parents
+    if hypernym_parents is None:
+        hypernym_parents=HypernymParentIndex()
+    return hypernym_parents
@@ -1,8 +1,13 @@
 from Generators import generateVerbSynsets, generatePhysicalSynsets
 from Generators import generateSingleWordAsSynset,generateWordAsSysnet
 from Generators import parseList,addKeyWords
+from Generators import setCandidateCache
+from Generators import flushCandidateCache
+from Generators import generateVerbSynsetsBatch,generatePhysicalSynsetsBatch
+from CandidateCache import CandidateCache
 from HierarchyGeneration import SynsetResolver
 from Hueristics import synsetResolve,definitionResolve
 from Hueristics import propertyResolve,clusterMaxResolve,pathResolve
 from Hueristics import directHueristic
+from Hueristics import synsetResolveBatch,definitionResolveBatch
 #from DataStructures import breadthFirstSearch
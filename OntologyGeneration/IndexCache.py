@@ -0,0 +1,65 @@
+###############################################################################
+##IndexCache.py
+##Last Modified: 10-18-2026
+##
+##Holds the functions shared by everything we precompute and keep on disk
+##between runs (candidate stores, WordNet and FrameNet indexes)
+###############################################################################
+import os
+
+##The environment variable that can be used to move the cache somewhere else
+CACHE_VARIABLE="ASEG_CACHE_DIR"
+
+##Finds (and creates if needed) the directory where precomputed data is kept.
+#By default this is a cache directory next to the package
+#@returns the path to the cache directory
+def getCacheDirectory():
+    directory=os.environ.get(CACHE_VARIABLE)
+    if directory is None:
+        directory=os.path.join(os.path.dirname(os.path.abspath(__file__)),"cache")
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    return directory
+
+##Gives the full path of a file kept in the cache directory
+#@param name The file name of the cached item
+#@returns the path to the cached item
+def cachePath(name):
+    return os.path.join(getCacheDirectory(),name)
+
+##The version of WordNet that nltk is reading. Everything computed from WordNet is stamped
+#with this so a different WordNet throws the old data out
+#@returns the version as a string (i.e. "3.0")
+def wordNetVersion():
+    from nltk.corpus import wordnet as wn
+    return str(wn.get_version())
+
+##Saves a group of numpy arrays to the cache with a stamp describing what they were built from
+#@param path The .npz file to save to. It is written beside the path and moved into place, so a reader (or another
+#process saving the same arrays) never sees half a file
+#@param stamp A string that must match when the arrays are loaded (i.e. the WordNet version)
+#@param arrays The named arrays to save
+def saveArrays(path,stamp,**arrays):
+    import numpy as np
+    arrays["stamp"]=np.array(stamp)
+    if not path.endswith(".npz"): #As numpy.savez names it
+        path+=".npz"
+    temporary=path[:-len(".npz")]+"."+str(os.getpid())+".tmp.npz"
+    np.savez(temporary,**arrays)
+    os.rename(temporary,path)
+
+##Loads a group of arrays saved with saveArrays
+#@param path The .npz file to load from
+#@param stamp The stamp the arrays must have been saved with
+#@returns a dictionary of name=>array, or None if the file is missing or was built from something else
+def loadArrays(path,stamp):
+    import numpy as np
+    if not os.path.isfile(path):
+        return None
+    data=np.load(path)
+    try:
+        if "stamp" not in data.files or str(data["stamp"]) != stamp:
+            return None
+        return dict((name,data[name]) for name in data.files if name != "stamp")
+    finally:
+        data.close()
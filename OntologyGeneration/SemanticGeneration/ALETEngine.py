@@ -0,0 +1,155 @@
+###############################################################################
+##ALETEngine.py
+##Last Modified: 10-18-2026
+##
+##Finds the Non-Interaction Function Information (NIFI) and roles of action
+##nodes as in Balint and Allbeck 2017. Action nodes are grouped by the frame
+##they resolve to, so the roles of each frame are only matched once for a set
+##of keywords, and the frames can be spread over a pool of processes. Only
+##frame names and keywords are sent to the workers, which open the same
+##participant index as the engine's ontology
+###############################################################################
+import multiprocessing
+from nltk.corpus import framenet as fn
+from FrameHandling import FrameOntology
+from FrameIndexes import ParticipantIndex
+from FrameIndexes import SemTypeIndex
+
+##Turns the matched frame elements of a frame into the role sets ALET stores
+#@param adverb_matches The (core,non-core) elements matched by the adverbs
+#@param object_matches The (core,non-core) elements matched by the objects
+#@returns a tuple of (adverb roles,object roles), where an object role is left out if it is already an adverb role
+def roleSets(adverb_matches,object_matches):
+    adverb_roles=set([m.name.lower() for m in adverb_matches[0]+adverb_matches[1]])
+    object_roles=set([m.name.lower() for m in object_matches[0]+object_matches[1] if m.name.lower() not in adverb_roles])
+    return (adverb_roles,object_roles)
+
+##The participant index of a worker, set up by initializeWorker
+worker_index=None
+
+##Opens the participant index of the engine's ontology in a worker before any work is given to it
+#@param participant_path The file the participant index is kept in
+#@param sem_type_path The file the semantic type names are kept in
+def initializeWorker(participant_path,sem_type_path):
+    global worker_index
+    worker_index=ParticipantIndex(SemTypeIndex(sem_type_path),participant_path)
+
+##Finds the roles of a shard of frames inside a worker
+#@param job A tuple of (frame names,adverbs,objects)
+#@returns a list with the (adverb roles,object roles) of every frame in the shard
+def matchShard(job):
+    (names,adverbs,objects)=job
+    frames=[fn.frame(name) for name in names]
+    index=worker_index
+    return [roleSets(a,o) for (a,o) in zip(index.match(frames,adverbs),index.match(frames,objects))]
+
+##Runs ALET over the action nodes of an ontology
+class ALETEngine:
+    ##Creates the engine
+    #@param ontology (Defaults to a new FrameOntology) The FrameOntology used to find frames and their participants
+    #@param processes (Defaults to None) The number of worker processes the frames are spread over. None runs them in this process
+    #@param shards_per_process (Defaults to 4) How many pieces the frames are cut into for each worker
+    def __init__(self,ontology = None,processes = None,shards_per_process = 4):
+        if ontology is None:
+            ontology=FrameOntology(None)
+
+        ##The FrameOntology
+        self.ontology=ontology
+
+        ##The number of worker processes (None or 1 keeps everything in this process)
+        self.processes=processes
+
+        ##How many pieces the frames are cut into for each worker
+        self.shards_per_process=shards_per_process
+
+        ##(frame name,adverbs,objects)=>(adverb roles,object roles) for every frame matched so far
+        self.__roles={}
+
+        ##The pool of workers, made the first time frames are spread over processes and kept until close
+        self.__pool=None
+
+    ##Gets the pool of workers, making it if needed. The ontology's participant index is loaded (and built if the
+    #cache is cold) here first, so the workers only read it
+    #@returns a multiprocessing pool
+    def pool(self):
+        if self.__pool is None:
+            participants=self.ontology.participants
+            participants.load()
+            self.__pool=multiprocessing.Pool(self.processes,initializer=initializeWorker,
+                                             initargs=(participants.path,participants.sem_types.path))
+        return self.__pool
+
+    ##Shuts down the pool of workers, if there is one. A later run makes a new pool
+    def close(self):
+        if self.__pool is not None:
+            self.__pool.close()
+            self.__pool.join()
+            self.__pool=None
+
+    ##Determines the frame of an action node, or of its nearest hypernym that has one
+    #@param node The WordNetNode (or False)
+    #@returns the frame, or None if there is none
+    def frameOf(self,node):
+        if node is False:
+            return None
+        return self.ontology.getFrameRecursive(node.getSynSet())
+
+    ##Groups the action nodes by the frame they resolve to
+    #@param actions The action set as a dictionary, where each action has a list of WordNetNodes (or False)
+    #@returns a tuple of (frame name=>frame,frame name=>list of nodes). Nodes without a frame are left out
+    def groupByFrame(self,actions):
+        frames={}
+        groups={}
+        for action in actions:
+            if actions[action] is not False:
+                for act in actions[action]:
+                    frame=self.frameOf(act)
+                    if frame is not None:
+                        frames[frame.name]=frame
+                        groups.setdefault(frame.name,[]).append(act)
+        return (frames,groups)
+
+    ##Finds the roles of many frames for one set of keywords, matching only the frames that have not been seen before
+    #@param frames The dictionary of frame name=>frame
+    #@param adverbs The set of adverb keywords
+    #@param objects The set of object keywords
+    #@returns a dictionary of frame name=>(adverb roles,object roles)
+    def frameRoles(self,frames,adverbs,objects):
+        adverbs=frozenset(adverbs)
+        objects=frozenset(objects)
+        names=sorted(name for name in frames if (name,adverbs,objects) not in self.__roles)
+        if len(names) > 0:
+            if self.processes is not None and self.processes > 1 and len(names) > 1:
+                shard_count=max(1,min(len(names),self.processes*self.shards_per_process))
+                shards=[names[i::shard_count] for i in range(shard_count)]
+                results=self.pool().map(matchShard,[(shard,adverbs,objects) for shard in shards])
+                for shard,roles in zip(shards,results):
+                    for name,role in zip(shard,roles):
+                        self.__roles[(name,adverbs,objects)]=role
+            else:
+                selected=[frames[name] for name in names]
+                adverb_matches=self.ontology.getParticipantsMatches(selected,adverbs)
+                object_matches=self.ontology.getParticipantsMatches(selected,objects)
+                for name,a,o in zip(names,adverb_matches,object_matches):
+                    self.__roles[(name,adverbs,objects)]=roleSets(a,o)
+        return dict((name,self.__roles[(name,adverbs,objects)]) for name in frames)
+
+    ##Determines NIFI and roles of the actions. Every action node has its properties cleared, and the nodes with a frame
+    #are given the tuple (adverb roles,object roles)
+    #@param actions The action set as a dictionary, where each action has a list of WordNetNodes
+    #@param adverbs The set of adverb keywords to look for
+    #@param objects The set of object keywords (and adjectives if you are doing the full ALET) to match roles on
+    #@returns None, (NIFI,Roles) are set as properties of the Node
+    def run(self,actions,adverbs,objects):
+        for action in actions:
+            if actions[action] is not False:
+                for act in actions[action]:
+                    act.setProperties([])
+        (frames,groups)=self.groupByFrame(actions)
+        roles=self.frameRoles(frames,adverbs,objects)
+        for name in groups:
+            (adverb_roles,object_roles)=roles[name]
+            for act in groups[name]:
+                #Each node gets its own sets, so no two nodes share them
+                act.setProperties((set(adverb_roles),set(object_roles)))
+        return None
@@ -1,7 +1,7 @@
 from nltk.corpus import framenet as fn
 from nltk.tokenize import RegexpTokenizer    
 import re,sys,inspect  #Tells you the information for a module inspect.getmembers(module)
-import parse
+from FrameIndexes import verbMapIndex,frameResolver,semTypeIndex,participantIndex
 from ..CommonFunctions import *
 
     
@@ -29,36 +29,30 @@ class FrameOntology:
     them to objects in the object ontology'''
     def __init__(self,database,parse_text="FnWnVerbMap.1.0.txt"):
         self.tokenizer=tokenizer=RegexpTokenizer(r'\w+')
-        (verbnet,framenet)=parse.parse(parse_text)
-        self.frame_dict=verbnet
+        #synset=>frame name, compiled once from the map file and shared between processes
+        self.frame_dict=verbMapIndex(parse_text)
+        #synset=>inherited frame, worked out once for every verb and kept on disk
+        self.resolver=frameResolver(self.frame_dict)
+        #semantic type=>names of it and every type below it
+        self.sem_types=semTypeIndex()
+        #keyword=>the frame elements it matches
+        self.participants=participantIndex()
         self.database=database
 
     ##Gets a frame from a synset
     def getFrameSynset(self,synset):
-        try:
-            if synset in self.frame_dict:
-                #print synset,self.frame_dict[synset]
-                frame=fn.frame(self.frame_dict[synset].capitalize())
-                return frame
-        except:
-            pass
-        return None
+        name=self.resolver.mappedName(synset)
+        if name is None:
+            return None
+        return self.resolver.frame(name)
 
     ##Gets a frame from a wordnet node
     def getFrame(self,node):
         return self.getFrameSynset(node.getSynSet())
 
-    ##Does a recursive parse on the synsets until the synset has no parent
+    ##Gets the frame of a synset, or of its nearest hypernym that has one
     def getFrameRecursive(self,synset):
-        frame=self.getFrameSynset(synset)
-        if frame is None:
-            hyper=synset.hypernyms()
-            count=0
-            if len(hyper) > 0:
-                while frame is None and count < len(hyper):
-                    frame=self.getFrameRecursive(hyper[count])
-                    count+=1
-        return frame
+        return self.resolver.resolve(synset)
 
     ##returns the first frame by a verb lemma (i.e str+'v')
     def getFrameLemma(self,lemma):
@@ -81,22 +75,14 @@ class FrameOntology:
 
     ##Gets the participants (Functional Elements) of a frame
     def getParticipantsMatch(self,frame,keywords):
-        fus=frame.FE
-        core_elements=[]
-        non_core_elements=[]
-        for obj in fus.keys():
-            semType=fus[obj].semType
-            #print obj.lower(),
-            #print type(obj.lower())
-            
-            if obj.lower() in keywords or len(set(obj.lower().split("_")).intersection(keywords)) > 0  or self.__searchSemType(semType,keywords):
-                #print "found",obj.lower()
-                if fus[obj].coreType == "Core":
-                    core_elements.append(fus[obj])
-                else:
-                    non_core_elements.append(fus[obj])
-            #print obj.lower()
-        return (core_elements,non_core_elements)
+        return self.participants.match([frame],keywords)[0]
+
+    ##Gets the participants (Functional Elements) of many frames that match one set of keywords
+    #@param frames The list of frames
+    #@param keywords The keywords
+    #@returns a list with (core elements,non-core elements) for each frame
+    def getParticipantsMatches(self,frames,keywords):
+        return self.participants.match(frames,keywords)
     ##Finds all the keywords that match a given FE
     def getKeywordMatch(self,FE,keywords):
         matched = []
@@ -111,24 +97,11 @@ class FrameOntology:
                    if not found and s in keywords:
                         found=True
                         matched.append(s)
-            for word in keywords:
-                if not found and self.__searchSemType(semType,[word]):
-                    matched.append(word)
+            if not found:
+                names=self.sem_types.names(semType)
+                matched.extend(word for word in keywords if word in names)
         return matched
 
-    def __searchSemType(self,sem,keywords):
-        found=False
-        if sem is not None:
-            obj=[sem.name.lower()]
-            for o in obj:
-                if o in keywords:
-                    return True
-            sub_types=[i for i in sem.subTypes]
-            while len(sub_types) > 0 and not found:
-                sem=sub_types.pop(0)
-                found=self.__searchSemType(sem,keywords)
-        return found
-
     
     def chooseParticipationConstraints(self,frame,act_name):
         '''From a given grame, this allows a use to choose participation constrains
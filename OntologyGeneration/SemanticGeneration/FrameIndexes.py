@@ -0,0 +1,518 @@
+###############################################################################
+##FrameIndexes.py
+##Last Modified: 10-18-2026
+##
+##Holds the FrameNet and FrameNet-WordNet tables used by FrameOntology. Each
+##one is built once, kept in the cache directory, and rebuilt when what it was
+##built from changes
+###############################################################################
+import os
+import hashlib
+import numpy as np
+from nltk.corpus import wordnet as wn
+from nltk.corpus import framenet as fn
+from ..IndexCache import cachePath,wordNetVersion,saveArrays,loadArrays
+from ..BinaryFormat import writeArrays,BinaryFile,StringTable,readString
+import parse
+
+##The parts of speech, in the order used by synsetKey
+POS_CODES="nvasr"
+
+##Turns a synset into a single integer that sorts by offset
+#@param synset The synset
+#@returns the key of the synset
+def synsetKey(synset):
+    return synset.offset()*len(POS_CODES)+POS_CODES.index(synset.pos())
+
+##The FrameNet-WordNet verb map (FnWnVerbMap) compiled into a binary table of synset=>(frame,verb). The table is
+#sorted by synset so a lookup is a binary search, and it is memory mapped so every process shares one copy.
+#It can be used in place of the frame dictionary from parse.parse
+class VerbMapIndex:
+    ##The kind stored in the header of the compiled file
+    KIND="fnwn-verb-map"
+
+    ##Sets up the index. Nothing is compiled or loaded until it is used
+    #@param source The text map file
+    #@param path (Defaults to a file in the cache directory named after the source) The compiled file
+    #@param mmap (Defaults to True) If true the table is memory mapped, otherwise it is read into memory
+    def __init__(self,source="FnWnVerbMap.1.0.txt",path=None,mmap=True):
+        if path is None:
+            name=os.path.basename(source)+"."+hashlib.md5(os.path.abspath(source)).hexdigest()[:12]+".bin"
+            path=cachePath(name)
+
+        ##The text map file
+        self.source=source
+
+        ##The location of the compiled table
+        self.path=path
+
+        ##If the table is memory mapped
+        self.mmap=mmap
+
+        ##The opened table, filled in on first use
+        self.__file=None
+
+    ##Describes what the table is built from, so a changed map file or WordNet rebuilds it
+    #@returns a dictionary of the source file, its size and modification time, and the WordNet version
+    def stamp(self):
+        info=os.stat(self.source)
+        return {"source":os.path.abspath(self.source),"size":info.st_size,"mtime":int(info.st_mtime),"wordnet":wordNetVersion()}
+
+    ##Reads the text map and writes the compiled table. When a synset is given more than once, the last line wins (as parse.parse)
+    def compile(self):
+        frames=StringTable()
+        verbs=StringTable()
+        rows={}
+        for (frame,verb,synset) in parse.readEntries(self.source):
+            rows[synsetKey(synset)]=(frames.intern(frame),verbs.intern(verb))
+        keys=sorted(rows)
+        (frame_offsets,frame_data)=frames.arrays()
+        (verb_offsets,verb_data)=verbs.arrays()
+        writeArrays(self.path,self.KIND,{"keys":np.array(keys,dtype=np.int64),
+                                         "frames":np.array([rows[key][0] for key in keys],dtype=np.int32),
+                                         "verbs":np.array([rows[key][1] for key in keys],dtype=np.int32),
+                                         "frame_offsets":frame_offsets,
+                                         "frame_data":frame_data,
+                                         "verb_offsets":verb_offsets,
+                                         "verb_data":verb_data},self.stamp())
+
+    ##Checks that a compiled table is whole: the keys are sorted without repeats and every id is in its string table
+    #@param table The opened BinaryFile
+    def validate(self,table):
+        keys=table["keys"]
+        for (ids,offsets) in (("frames","frame_offsets"),("verbs","verb_offsets")):
+            if len(table[ids]) != len(keys):
+                raise ValueError(self.path+" has "+str(len(table[ids]))+" "+ids+" for "+str(len(keys))+" synsets")
+            if len(keys) > 0 and (table[ids].min() < 0 or table[ids].max() >= len(table[offsets])-1):
+                raise ValueError(self.path+" has "+ids+" outside of its string table")
+        if len(keys) > 1 and not (np.diff(keys) > 0).all():
+            raise ValueError(self.path+" is not sorted by synset")
+
+    ##Opens the compiled table, compiling it first if it is missing or out of date. A compiled table is used as is when
+    #the text map is not there to check it against
+    #@returns the opened BinaryFile
+    def load(self):
+        if self.__file is None:
+            table=None
+            if os.path.isfile(self.path):
+                table=BinaryFile(self.path,self.KIND,self.mmap)
+                if os.path.isfile(self.source) and table.meta != self.stamp():
+                    table=None
+            if table is None:
+                self.compile()
+                table=BinaryFile(self.path,self.KIND,self.mmap)
+            self.validate(table)
+            self.__file=table
+        return self.__file
+
+    ##Finds the row of a synset
+    #@returns the row, or None if the synset is not in the map
+    def __row(self,synset):
+        if isinstance(synset,basestring):
+            return None
+        keys=self.load()["keys"]
+        key=synsetKey(synset)
+        row=int(np.searchsorted(keys,key))
+        if row < len(keys) and keys[row] == key:
+            return row
+        return None
+
+    ##Gets the frame name a synset maps to
+    #@param synset The verb synset
+    #@returns the frame name, or None if the synset is not in the map
+    def frame(self,synset):
+        row=self.__row(synset)
+        if row is None:
+            return None
+        table=self.load()
+        return readString(table["frame_offsets"],table["frame_data"],int(table["frames"][row]))
+
+    ##Gets the verb a synset maps to
+    #@param synset The verb synset
+    #@returns the verb, or None if the synset is not in the map
+    def verb(self,synset):
+        row=self.__row(synset)
+        if row is None:
+            return None
+        table=self.load()
+        return readString(table["verb_offsets"],table["verb_data"],int(table["verbs"][row]))
+
+    def __contains__(self,synset):
+        return self.__row(synset) is not None
+
+    ##Gets the frame name of a synset the way the frame dictionary does
+    def __getitem__(self,synset):
+        frame=self.frame(synset)
+        if frame is None:
+            raise KeyError(synset)
+        return frame
+
+    def __len__(self):
+        return len(self.load()["keys"])
+
+##The verb maps that have been opened, by source file
+verb_map_indexes={}
+
+##Gets the shared verb map for a source file, creating it the first time
+#@param source The text map file
+#@returns the VerbMapIndex of that file
+def verbMapIndex(source="FnWnVerbMap.1.0.txt"):
+    key=os.path.abspath(source)
+    if key not in verb_map_indexes:
+        verb_map_indexes[key]=VerbMapIndex(source)
+    return verb_map_indexes[key]
+
+##Finds the frame of a synset the way FrameOntology.getFrameRecursive does: the frame the synset maps to if FrameNet
+#has it, otherwise the frame of its first hypernym that has one (searching each hypernym fully before the next).
+#The inherited frame of every verb is worked out in one pass and kept on disk, and each frame is only read from
+#FrameNet once
+class FrameResolver:
+    ##Sets up the resolver. Nothing is built or loaded until it is used
+    #@param verb_map The synset=>frame name map (a VerbMapIndex, or the dictionary from parse.parse)
+    #@param path (Defaults to a file in the cache directory named after the map) The file the table is kept in.
+    #Only a VerbMapIndex is kept on disk, since a dictionary has nothing to check the table against
+    def __init__(self,verb_map,path=None):
+        if path is None and hasattr(verb_map,"stamp"):
+            path=cachePath("inherited_frames."+hashlib.md5(os.path.abspath(verb_map.source)).hexdigest()[:12]+".npz")
+
+        ##The synset=>frame name map
+        self.verb_map=verb_map
+
+        ##The location of the table (None keeps it in memory only)
+        self.path=path
+
+        ##synset key=>inherited frame name (or None), filled in on first use
+        self.__table=None
+
+        ##The names of the frames FrameNet has, filled in on first use
+        self.__names=None
+
+        ##frame name=>FrameNet frame
+        self.__frames={}
+
+    ##The names of all FrameNet frames
+    def frameNames(self):
+        if self.__names is None:
+            self.__names=frozenset(fn.frame_ids_and_names().values())
+        return self.__names
+
+    ##Gets the frame name a synset maps to itself, if FrameNet has that frame (as getFrameSynset)
+    #@param synset The synset
+    #@returns the frame name, or None
+    def mappedName(self,synset):
+        if synset in self.verb_map:
+            name=self.verb_map[synset].capitalize()
+            if name in self.frameNames():
+                return name
+        return None
+
+    ##Works out the inherited frame name of a synset, adding it (and the hypernyms it needed) to a table
+    #@param synset The synset
+    #@param table The dictionary of synset key=>frame name to fill in
+    #@param working (Defaults to None) The keys of the synsets being worked on, which stops the hypernym cycles in WordNet
+    #@returns the frame name, or None
+    def inherit(self,synset,table,working = None):
+        key=synsetKey(synset)
+        if key in table:
+            return table[key]
+        if working is None:
+            working=set()
+        name=self.mappedName(synset)
+        if name is None:
+            working.add(key)
+            for hyp in synset.hypernyms():
+                if synsetKey(hyp) not in working:
+                    name=self.inherit(hyp,table,working)
+                    if name is not None:
+                        break
+            working.discard(key)
+        table[key]=name
+        return name
+
+    ##Builds the table by working out the inherited frame of every verb
+    #@returns a dictionary of synset key=>frame name (or None)
+    def build(self):
+        table={}
+        for synset in wn.all_synsets(wn.VERB):
+            self.inherit(synset,table)
+        return table
+
+    ##Describes what the table is built from. The stamp of the compiled map is used, so this works when the map is
+    #deployed without its text file
+    def stamp(self):
+        names=hashlib.md5("\n".join(sorted(self.frameNames()))).hexdigest()
+        return repr(sorted(self.verb_map.load().meta.items()))+":"+names
+
+    ##Loads the table from disk, building (and saving) it if it is missing or out of date
+    def load(self):
+        if self.__table is None:
+            if self.path is None:
+                self.__table=self.build()
+                return self.__table
+            stamp=self.stamp()
+            arrays=loadArrays(self.path,stamp)
+            if arrays is None:
+                table=self.build()
+                strings=StringTable()
+                keys=sorted(table)
+                names=np.array([-1 if table[key] is None else strings.intern(table[key]) for key in keys],dtype=np.int32)
+                (offsets,data)=strings.arrays()
+                arrays={"keys":np.array(keys,dtype=np.int64),"names":names,"name_offsets":offsets,"name_data":data}
+                saveArrays(self.path,stamp,**arrays)
+                self.__table=table
+            else:
+                names=[readString(arrays["name_offsets"],arrays["name_data"],i) for i in range(len(arrays["name_offsets"])-1)]
+                self.__table=dict((key,None if i < 0 else names[i]) for key,i in zip(arrays["keys"].tolist(),arrays["names"].tolist()))
+        return self.__table
+
+    ##Gets a FrameNet frame by name, reading it from FrameNet only the first time
+    #@param name The frame name
+    #@returns the frame, or None if FrameNet cannot give it
+    def frame(self,name):
+        if name not in self.__frames:
+            try:
+                self.__frames[name]=fn.frame(name)
+            except Exception:
+                self.__frames[name]=None
+        return self.__frames[name]
+
+    ##Gets the name of the inherited frame of a synset
+    #@param synset The synset (synsets other than verbs are worked out when they are first asked for)
+    #@returns the frame name, or None if neither the synset nor any of its hypernyms has a frame
+    def frameName(self,synset):
+        if isinstance(synset,basestring):
+            return None
+        return self.inherit(synset,self.load())
+
+    ##Gets the inherited frame of a synset (as getFrameRecursive)
+    #@param synset The synset
+    #@returns the FrameNet frame, or None
+    def resolve(self,synset):
+        name=self.frameName(synset)
+        if name is None:
+            return None
+        return self.frame(name)
+
+##The frame resolvers that have been made, by verb map
+frame_resolvers={}
+
+##Gets the shared frame resolver of a verb map, creating it the first time
+#@param verb_map The VerbMapIndex
+#@returns the FrameResolver of that map
+def frameResolver(verb_map):
+    if id(verb_map) not in frame_resolvers:
+        frame_resolvers[id(verb_map)]=FrameResolver(verb_map)
+    return frame_resolvers[id(verb_map)]
+
+##Describes a file of the FrameNet install, so tables built from it are rebuilt when it changes
+#@param fileid (Defaults to "semTypes.xml") The FrameNet file
+#@returns the location of the file with its size and modification time
+def frameNetStamp(fileid = "semTypes.xml"):
+    pointer=fn.abspath(fileid)
+    path=getattr(pointer,"path",str(pointer))
+    try:
+        info=os.stat(path)
+    except OSError:
+        return path
+    return path+":"+str(info.st_size)+":"+str(int(info.st_mtime))
+
+##The lower-cased names of every FrameNet semantic type and all of the types below it, so checking a semantic type
+#against keywords is one set lookup instead of a walk over subTypes
+class SemTypeIndex:
+    ##Sets up the index. Nothing is built or loaded until it is used
+    #@param path (Defaults to a file in the cache directory) The file the names are kept in
+    def __init__(self,path=None):
+        if path is None:
+            path=cachePath("semtype_names.npz")
+
+        ##The location of the names
+        self.path=path
+
+        ##semantic type ID=>frozenset of names, filled in on first use
+        self.__names=None
+
+    ##Gets the names of a semantic type and everything below it
+    #@param sem The semantic type
+    #@param working (Defaults to None) The IDs of the types being worked on, in case FrameNet ever has a cycle
+    #@returns a set of lower-cased names
+    def descendants(self,sem,working = None):
+        if working is None:
+            working=set()
+        working.add(sem.ID)
+        names=set([sem.name.lower()])
+        for sub in sem.subTypes:
+            if sub.ID not in working:
+                names|=self.descendants(sub,working)
+        return names
+
+    ##Builds the names of every semantic type
+    #@returns a dictionary of semantic type ID=>frozenset of names
+    def build(self):
+        return dict((sem.ID,frozenset(self.descendants(sem))) for sem in fn.semtypes())
+
+    ##Loads the names from disk, building (and saving) them if they are missing or out of date
+    def load(self):
+        if self.__names is None:
+            stamp=frameNetStamp()
+            arrays=loadArrays(self.path,stamp)
+            if arrays is None:
+                table=self.build()
+                strings=StringTable()
+                keys=sorted(table)
+                indptr=np.zeros(len(keys)+1,dtype=np.int64)
+                indptr[1:]=np.cumsum([len(table[key]) for key in keys])
+                names=np.array([strings.intern(name) for key in keys for name in sorted(table[key])],dtype=np.int32)
+                (offsets,data)=strings.arrays()
+                saveArrays(self.path,stamp,keys=np.array(keys,dtype=np.int64),indptr=indptr,names=names,
+                           name_offsets=offsets,name_data=data)
+                self.__names=table
+            else:
+                strings=[readString(arrays["name_offsets"],arrays["name_data"],i) for i in range(len(arrays["name_offsets"])-1)]
+                indptr=arrays["indptr"]
+                names=arrays["names"]
+                self.__names=dict((key,frozenset(strings[i] for i in names[indptr[row]:indptr[row+1]]))
+                                  for row,key in enumerate(arrays["keys"].tolist()))
+        return self.__names
+
+    ##Gets the names of a semantic type and everything below it
+    #@param sem The semantic type (or None)
+    #@returns a frozenset of lower-cased names (empty for None)
+    def names(self,sem):
+        if sem is None:
+            return frozenset()
+        table=self.load()
+        if sem.ID not in table:
+            table[sem.ID]=frozenset(self.descendants(sem))
+        return table[sem.ID]
+
+##The shared semantic type index, created on first use
+sem_type_index=None
+
+##Gets the shared semantic type index
+def semTypeIndex():
+    global sem_type_index
+    if sem_type_index is None:
+        sem_type_index=SemTypeIndex()
+    return sem_type_index
+
+##Every FrameNet frame element listed under the keywords that getParticipantsMatch matches it on: its lower-cased
+#name, each "_" separated part of that name, and the names of its semantic type and the types below it. The
+#matches of many frames against one set of keywords are then found with one lookup per keyword
+class ParticipantIndex:
+    ##Sets up the index. Nothing is built or loaded until it is used
+    #@param sem_types (Defaults to the shared SemTypeIndex) The semantic type names
+    #@param path (Defaults to a file in the cache directory) The file the index is kept in
+    def __init__(self,sem_types=None,path=None):
+        if sem_types is None:
+            sem_types=semTypeIndex()
+        if path is None:
+            path=cachePath("participants.npz")
+
+        ##The semantic type names
+        self.sem_types=sem_types
+
+        ##The location of the index
+        self.path=path
+
+        ##keyword=>list of (frame name,FE name,is core), filled in on first use
+        self.__entries=None
+
+        ##The names of the frames in the index
+        self.__frames=None
+
+    ##Gets the keywords a frame element is matched on
+    #@param name The FE name
+    #@param fe The FE
+    #@returns a set of lower-cased keywords
+    def keywords(self,name,fe):
+        name=name.lower()
+        return set([name]+name.split("_"))|self.sem_types.names(fe.semType)
+
+    ##Adds the frame elements of a frame to the index
+    #@param frame The FrameNet frame
+    #@param entries The dictionary of keyword=>entries to add to
+    def addFrame(self,frame,entries):
+        for (name,fe) in frame.FE.items():
+            entry=(frame.name,name,fe.coreType == "Core")
+            for keyword in self.keywords(name,fe):
+                entries.setdefault(keyword,[]).append(entry)
+
+    ##Builds the index from every frame in FrameNet
+    #@returns a tuple of (the dictionary of keyword=>entries,the set of frame names)
+    def build(self):
+        entries={}
+        frames=set()
+        for frame in fn.frames():
+            self.addFrame(frame,entries)
+            frames.add(frame.name)
+        return (entries,frames)
+
+    ##Loads the index from disk, building (and saving) it if it is missing or out of date
+    def load(self):
+        if self.__entries is None:
+            stamp=frameNetStamp("frameIndex.xml")+"|"+frameNetStamp()
+            arrays=loadArrays(self.path,stamp)
+            if arrays is None:
+                (entries,frames)=self.build()
+                strings=StringTable()
+                rows=[(strings.intern(keyword),strings.intern(frame),strings.intern(name),core)
+                      for keyword in sorted(entries) for (frame,name,core) in entries[keyword]]
+                indexed=np.array([strings.intern(frame) for frame in sorted(frames)],dtype=np.int32)
+                (offsets,data)=strings.arrays()
+                saveArrays(self.path,stamp,
+                           keywords=np.array([row[0] for row in rows],dtype=np.int32),
+                           frames=np.array([row[1] for row in rows],dtype=np.int32),
+                           names=np.array([row[2] for row in rows],dtype=np.int32),
+                           core=np.array([row[3] for row in rows],dtype=bool),
+                           indexed=indexed,
+                           string_offsets=offsets,string_data=data)
+            else:
+                strings=[readString(arrays["string_offsets"],arrays["string_data"],i) for i in range(len(arrays["string_offsets"])-1)]
+                entries={}
+                for (keyword,frame,name,core) in zip(arrays["keywords"].tolist(),arrays["frames"].tolist(),
+                                                     arrays["names"].tolist(),arrays["core"].tolist()):
+                    entries.setdefault(strings[keyword],[]).append((strings[frame],strings[name],core))
+                frames=set(strings[i] for i in arrays["indexed"].tolist())
+            self.__entries=entries
+            self.__frames=frames
+        return self.__entries
+
+    ##Finds the frame elements of many frames that match a set of keywords
+    #@param frames A list of FrameNet frames (frames that are not in the index are added to it)
+    #@param keywords The lower-cased keywords
+    #@returns a list with (core elements,non-core elements) for each frame, in the order of frame.FE (as getParticipantsMatch)
+    def match(self,frames,keywords):
+        entries=self.load()
+        for frame in frames:
+            if frame.name not in self.__frames:
+                self.addFrame(frame,entries)
+                self.__frames.add(frame.name)
+        wanted=set(frame.name for frame in frames)
+        found={}
+        for keyword in set(keywords):
+            for (frame,name,core) in entries.get(keyword,()):
+                if frame in wanted:
+                    found.setdefault(frame,set()).add(name)
+        results=[]
+        for frame in frames:
+            names=found.get(frame.name,())
+            core_elements=[]
+            non_core_elements=[]
+            for obj in frame.FE.keys():
+                if obj in names:
+                    if frame.FE[obj].coreType == "Core":
+                        core_elements.append(frame.FE[obj])
+                    else:
+                        non_core_elements.append(frame.FE[obj])
+            results.append((core_elements,non_core_elements))
+        return results
+
+##The shared participant index, created on first use
+participant_index=None
+
+##Gets the shared participant index
+def participantIndex():
+    global participant_index
+    if participant_index is None:
+        participant_index=ParticipantIndex()
+    return participant_index
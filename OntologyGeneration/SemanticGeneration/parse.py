@@ -1,20 +1,29 @@
 from nltk.corpus import wordnet
+from nltk.corpus.reader.wordnet import WordNetError
+
+##Reads the FrameNet-WordNet verb map. Each line is a frame, a verb, and the WordNet sense keys that map to them
+#@param file The map file
+#@returns a generator of (frame,verb,synset) for every sense key that WordNet knows. Keys it does not know are skipped
+def readEntries(file):
+    f = open(file, 'r')
+    try:
+        for line in f:
+            x = line.strip().split(" ")
+            for key in range(2,len(x)):
+                try:
+                    synset = wordnet.lemma_from_key(x[key]).synset()
+                except (WordNetError,ValueError):
+                    continue
+                yield (x[0],x[1],synset)
+    finally:
+        f.close()
 
 def parse(file):
     framedict = {}
     verbdict = {}
-    f = open(file, 'r+')
-    for line in f:
-        x = line.strip().split(" ")
-        for key in range(2,len(x)):
-            try:
-                synset = wordnet.lemma_from_key(x[key]).synset()
-            except:
-                #print x,key
-                pass
-            #print synset
-            framedict[synset] = x[0]
-            verbdict[synset] = x[1]
+    for (frame,verb,synset) in readEntries(file):
+        framedict[synset] = frame
+        verbdict[synset] = verb
     #print framedict
     #print verbdict
     return (framedict,verbdict)
@@ -0,0 +1,139 @@
+###############################################################################
+##Traversal.py
+##Last Modified: 10-18-2026
+##
+##Iterative traversals over forests of WordNetNodes. Every traversal works on
+##trees and on multi-parent DAGs, visits each node once, and never recurses,
+##so deep hypernym chains do not run into Python's recursion limit
+###############################################################################
+from collections import deque
+
+##Lets a traversal take a single root or a list of roots
+#@param roots A node or a list of nodes
+#@returns a list of nodes
+def rootList(roots):
+    if roots is None:
+        return []
+    if isinstance(roots,list):
+        return roots
+    return [roots]
+
+##The children of a node, as a list even if the node has none
+#@param node The node
+#@returns a list of children
+def childList(node):
+    children=node.getChildren()
+    if children is None:
+        return []
+    return children
+
+##Goes through a forest breadth first
+#@param roots A root node or a list of root nodes
+#@returns a generator of the nodes, each given once in breadth first order
+def breadthFirst(roots):
+    queue=deque()
+    seen=set()
+    for root in rootList(roots):
+        if root.identity() not in seen:
+            seen.add(root.identity())
+            queue.append(root)
+    while len(queue) > 0:
+        node=queue.popleft()
+        yield node
+        for child in childList(node):
+            if child.identity() not in seen:
+                seen.add(child.identity())
+                queue.append(child)
+
+##Goes through a forest depth first, giving each node before its children
+#@param roots A root node or a list of root nodes
+#@returns a generator of the nodes, each given once in pre-order
+def depthFirst(roots):
+    stack=list(reversed(rootList(roots)))
+    seen=set()
+    while len(stack) > 0:
+        node=stack.pop()
+        if node.identity() in seen:
+            continue
+        seen.add(node.identity())
+        yield node
+        stack.extend(reversed(childList(node)))
+
+##Goes through a forest depth first, giving each node after all of its children
+#@param roots A root node or a list of root nodes
+#@returns a generator of the nodes, each given once in post-order
+def postOrder(roots):
+    seen=set()
+    for root in rootList(roots):
+        if root.identity() in seen:
+            continue
+        seen.add(root.identity())
+        stack=[(root,iter(childList(root)))]
+        while len(stack) > 0:
+            (node,children)=stack[-1]
+            for child in children:
+                if child.identity() not in seen:
+                    seen.add(child.identity())
+                    stack.append((child,iter(childList(child))))
+                    break
+            else:
+                stack.pop()
+                yield node
+
+##Finds the leaves (nodes without children) of a forest
+#@param roots A root node or a list of root nodes
+#@returns a generator of the leaves, each given once in pre-order
+def leaves(roots):
+    for node in depthFirst(roots):
+        if len(childList(node)) == 0:
+            yield node
+
+##Finds the first node holding a synset, searching depth first
+#@param roots A root node or a list of root nodes
+#@param synset The synset (or string) to look for. The node must hold this exact object
+#@returns the node, or None if no node holds the synset
+def findSynset(roots,synset):
+    for node in depthFirst(roots):
+        if node.getSynSet() is synset:
+            return node
+    return None
+
+##Numbers a forest breadth first. Nodes that already have a number keep it
+#@param roots A root node or a list of root nodes
+#@param start_number The first number to give out
+#@returns the number after the last one given out
+def numberBreadthFirst(roots,start_number):
+    counter=start_number
+    for node in breadthFirst(roots):
+        if node.getNumber() is None:
+            node.setNumber(counter)
+            counter+=1
+    return counter
+
+##Numbers a forest depth first, giving each node a number when it is first reached and a post number once its
+#children are done. A node that already has a number is treated as visited, so its children are not followed
+#@param roots A root node or a list of root nodes
+#@param start_number The first number to give out
+#@returns the number after the last one given out
+def numberDepthFirst(roots,start_number):
+    counter=start_number
+    for root in rootList(roots):
+        if root.getNumber() is not None:
+            continue
+        root.setNumber(counter)
+        counter+=1
+        stack=[(root,iter(childList(root)))]
+        while len(stack) > 0:
+            (node,children)=stack[-1]
+            for child in children:
+                if child.getNumber() is None:
+                    child.setNumber(counter)
+                    counter+=1
+                    stack.append((child,iter(childList(child))))
+                    break
+            else:
+                stack.pop()
+                if node.getPostNumber() is None:
+                    node.setPostNumber(counter)
+                    counter+=1
+    return counter